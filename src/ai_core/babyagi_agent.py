@@ -1,111 +0,0 @@
-import logging
-import time
-import uuid
-import os
-import cv2
-import pymongo
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QTextEdit,
-                             QLineEdit, QLabel, QTextBrowser, QFileDialog)
-from PyQt5.QtGui import QFont
-from src.ai_core.model_integration import AIModel
-from src.real_time_learning import SelfLearningAI
-from src.ai_core.web_browsing import WebBrowsing
-from src.ai_core.self_improvement import SelfImprovement
-from src.ai_core.image_processing import ImageProcessing
-from src.ai_core.video_processing import VideoProcessing
-from src.database.user_data import UserData
-
-# Configure logging for the BabyAGI agent
-logging.basicConfig(
-    filename="logs/babyagi_agent.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
-
-class BabyAgiAgent:
-    """
-    AI Agent that manages autonomous tasks and integrates web browsing, self-improvement, image, and video processing.
-    """
-
-    def __init__(self, model_type="llama3", model_path="models/llama-7b.ggmlv3.q4_0.bin"):
-        self.ai_model = AIModel(model_type, model_path)
-        self.memory = SelfLearningAI()
-        self.web_browser = WebBrowsing(api_key="YOUR_API_KEY", search_engine_id="YOUR_SEARCH_ENGINE_ID")
-        self.self_improvement = SelfImprovement()
-        self.image_processing = ImageProcessing()
-        self.video_processing = VideoProcessing()
-        self.task_queue = []
-        logging.info("BabyAGI Agent Initialized.")
-
-    def add_task(self, objective, task_type="general", priority=1):
-        """
-        Adds a task to the queue with a specified type and priority.
-        """
-        task_id = str(uuid.uuid4())
-        task = {
-            "id": task_id,
-            "objective": objective,
-            "type": task_type,
-            "priority": priority,
-            "status": "pending"
-        }
-        self.task_queue.append(task)
-        logging.info(f"Task added: {task}")
-
-    def execute_task(self):
-        """
-        Executes the highest priority task in the queue.
-        """
-        if not self.task_queue:
-            logging.info("No tasks to execute.")
-            return "No tasks to execute."
-
-        self.task_queue.sort(key=lambda x: x["priority"], reverse=True)
-        task = self.task_queue.pop(0)
-        logging.info(f"Executing task: {task}")
-
-        if task["type"] == "web_search":
-            return self.web_browser.google_search(task["objective"])
-        elif task["type"] == "image_processing":
-            return self.image_processing.extract_text(task["objective"])
-        elif task["type"] == "video_processing":
-            return self.video_processing.detect_faces(task["objective"])
-        elif task["type"] == "code_generation":
-            generated_code = self.self_improvement.generate_code(task["objective"])
-            return self.self_improvement.save_generated_code("ai_generated_tool.py", generated_code)
-
-        return f"Task {task['objective']} executed successfully."
-
-    def refine_tasks(self):
-        """
-        Analyzes completed tasks and generates an optimized workflow plan.
-        """
-        completed_tasks = [t for t in self.task_queue if t["status"] == "completed"]
-        if not completed_tasks:
-            logging.info("No completed tasks to refine.")
-            return "No refinement available."
-
-        refinement_prompt = "Analyze the past task executions and suggest an optimized workflow for future tasks."
-        refined_plan = self.ai_model.generate_response(refinement_prompt)
-        logging.info(f"Refinement plan generated: {refined_plan}")
-        return refined_plan
-
-    def run(self, iterations=5):
-        """
-        Runs the agent for a specified number of iterations.
-        """
-        logging.info(f"Starting BabyAGI agent for {iterations} iterations.")
-        for i in range(iterations):
-            if self.task_queue:
-                result = self.execute_task()
-                logging.info(f"Iteration {i+1} executed. Result: {result}")
-            else:
-                logging.info("No tasks available. Waiting for new tasks.")
-            time.sleep(2)
-        logging.info("BabyAGI agent run completed.")
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    main_window = BabyAgiAgent()
-    main_window.show()
-    sys.exit(app.exec_())
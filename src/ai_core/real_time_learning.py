@@ -1,8 +1,14 @@
 import os
 import logging
+import hashlib
+import pickle
+import atexit
+import threading
+import weakref
 import numpy as np
 import json
 import time
+from collections import Counter, OrderedDict
 
 # Check if chromadb is available
 try:
@@ -13,6 +19,25 @@ except ImportError:
     CHROMADB_AVAILABLE = False
     logging.warning("chromadb not available. Using fallback memory storage.")
 
+# Maximum number of embeddings kept in the in-memory LRU cache
+EMBEDDING_CACHE_SIZE = 4096
+# Number of new embeddings after which the cache is written to disk
+EMBEDDING_CACHE_FLUSH_INTERVAL = 64
+# Sentence-transformers model used when available
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# Dimension of the hash-based fallback embedding
+FALLBACK_EMBEDDING_DIM = 768
+
+# Live instances whose unsaved embeddings are written out at interpreter exit
+_embedding_cache_owners = weakref.WeakSet()
+
+@atexit.register
+def _flush_embedding_caches():
+    """Write embeddings added since the last periodic flush."""
+    for owner in list(_embedding_cache_owners):
+        if owner._embedding_cache_unsaved:
+            owner.flush_embedding_cache()
+
 class SelfLearningAI:
     """
     Implements real-time learning and memory capabilities.
@@ -46,7 +71,7 @@ class SelfLearningAI:
                 # Initialize embedding function - use sentence transformers if available
                 try:
                     self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                        model_name="all-MiniLM-L6-v2"
+                        model_name=EMBEDDING_MODEL_NAME
                     )
                 except:
                     # Fallback to default embedding
@@ -64,10 +89,23 @@ class SelfLearningAI:
                 self.client = None
                 self.collection = None
         
-        # Fallback memory if ChromaDB is not available
+        # Embedding cache keyed by content hash, persisted across runs; one file per
+        # backend so vectors of different dimensions never mix
+        if self.embedding_function:
+            backend, self._embedding_dim = EMBEDDING_MODEL_NAME, None  # learned from the model
+        else:
+            backend, self._embedding_dim = f"hash-{FALLBACK_EMBEDDING_DIM}", FALLBACK_EMBEDDING_DIM
+        self.embedding_cache_file = os.path.join(self.persist_directory, f"emb_cache_{backend}.pkl")
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        self._embedding_cache_unsaved = 0
+        self._load_embedding_cache()
+        _embedding_cache_owners.add(self)
+        
+        # Fallback memory; also used when a ChromaDB operation fails
+        self.fallback_memory = []
+        self.fallback_memory_file = os.path.join(self.persist_directory, "memory.json")
         if not CHROMADB_AVAILABLE or not self.collection:
-            self.fallback_memory = []
-            self.fallback_memory_file = os.path.join(self.persist_directory, "memory.json")
             self._load_fallback_memory()
             logging.info("Using fallback memory storage")
     
@@ -89,10 +127,48 @@ class SelfLearningAI:
         except Exception as e:
             logging.error(f"Error saving fallback memory: {e}")
     
+    def _load_embedding_cache(self):
+        """Load cached embeddings from disk."""
+        if os.path.exists(self.embedding_cache_file):
+            try:
+                with open(self.embedding_cache_file, 'rb') as f:
+                    cached = pickle.load(f)
+                
+                # Drop vectors that don't match the backend's dimension
+                if self._embedding_dim is None and cached:
+                    self._embedding_dim = Counter(map(len, cached.values())).most_common(1)[0][0]
+                self._embedding_cache.update(
+                    (key, embedding) for key, embedding in cached.items()
+                    if len(embedding) == self._embedding_dim
+                )
+                logging.info(f"Loaded {len(self._embedding_cache)} cached embeddings")
+            except Exception as e:
+                logging.error(f"Error loading embedding cache: {e}")
+                self._embedding_cache.clear()
+    
+    def flush_embedding_cache(self):
+        """
+        Write the embedding cache to disk.
+        
+        Returns:
+            bool: Success status
+        """
+        with self._embedding_cache_lock:
+            snapshot = dict(self._embedding_cache)
+            self._embedding_cache_unsaved = 0
+        try:
+            with open(self.embedding_cache_file, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            return True
+        except Exception as e:
+            logging.error(f"Error saving embedding cache: {e}")
+            return False
+    
     def generate_embedding(self, text):
         """
         Generate an embedding vector for the text.
         Creates a basic embedding if advanced methods unavailable.
+        Results are cached by content hash, so repeated texts skip the embedding model.
         
         Args:
             text (str): Text to embed
@@ -102,14 +178,38 @@ class SelfLearningAI:
         """
         if not text:
             # Return zero vector for empty text
-            return [0.0] * 768
+            return [0.0] * (self._embedding_dim or FALLBACK_EMBEDDING_DIM)
+        
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._embedding_cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+                return embedding
         
-        # If using ChromaDB with embedding function, it will handle this internally
-        if not self.embedding_function:
+        if self.embedding_function:
+            embedding = [float(x) for x in self.embedding_function([text])[0]]
+        else:
             # Create a deterministic embedding based on text hash
             # This is a very simple fallback that won't have semantic properties
-            np.random.seed(hash(text) % 2**32)
-            return list(np.random.normal(0, 1, 768).astype(float))
+            rng = np.random.default_rng(int(key[:16], 16))
+            embedding = list(rng.normal(0, 1, FALLBACK_EMBEDDING_DIM).astype(float))
+        
+        with self._embedding_cache_lock:
+            if self._embedding_dim != len(embedding):
+                # The model's real dimension wins over whatever was inferred from disk
+                self._embedding_cache.clear()
+                self._embedding_dim = len(embedding)
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+            self._embedding_cache_unsaved += 1
+            flush = self._embedding_cache_unsaved >= EMBEDDING_CACHE_FLUSH_INTERVAL
+        
+        if flush:
+            self.flush_embedding_cache()
+        
+        return embedding
     
     def store_interaction(self, query, response):
         """
@@ -180,10 +280,17 @@ class SelfLearningAI:
         # Retrieve from ChromaDB if available
         if CHROMADB_AVAILABLE and self.collection:
             try:
-                results = self.collection.query(
-                    query_texts=[query],
-                    n_results=top_k
-                )
+                # Embed through the cache when we own the embedding function
+                if self.embedding_function:
+                    results = self.collection.query(
+                        query_embeddings=[self.generate_embedding(query)],
+                        n_results=top_k
+                    )
+                else:
+                    results = self.collection.query(
+                        query_texts=[query],
+                        n_results=top_k
+                    )
                 
                 if results and 'documents' in results and results['documents']:
                     documents = results['documents'][0]
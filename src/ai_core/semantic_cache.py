@@ -0,0 +1,144 @@
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+
+class SemanticCache:
+    """
+    Caches model responses keyed by query embeddings.
+    Uses random-projection LSH to find candidate entries, then verifies them
+    with exact cosine similarity so near-duplicate prompts reuse a response.
+    """
+
+    def __init__(self, similarity_threshold=0.95, num_tables=8, num_bits=12, max_entries=10000, seed=42):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            similarity_threshold (float): Minimum cosine similarity for a cache hit
+            num_tables (int): Number of LSH hash tables
+            num_bits (int): Number of hyperplanes (hash bits) per table
+            max_entries (int): Maximum number of cached responses
+            seed (int): Seed for the random hyperplanes
+        """
+        self.similarity_threshold = similarity_threshold
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self.max_entries = max_entries
+        self.seed = seed
+
+        # Hyperplanes are created lazily once the embedding dimension is known
+        self._planes = None
+        self._bit_weights = 1 << np.arange(num_bits, dtype=np.int64)
+        self._tables = [dict() for _ in range(num_tables)]
+        self._entries = OrderedDict()  # entry_id -> (unit vector, response, bucket keys)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        logging.info(f"SemanticCache initialized (threshold={similarity_threshold})")
+
+    def _normalize(self, embedding):
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def _bucket_keys(self, vector):
+        """Compute one bucket key per LSH table for a vector."""
+        if self._planes is None:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.num_tables, self.num_bits, vector.shape[0])).astype(np.float32)
+
+        # Sign of each projection gives one bit; pack bits into an int per table
+        bits = (self._planes @ vector) > 0
+        return (bits @ self._bit_weights).tolist()
+
+    def get(self, embedding):
+        """
+        Look up a cached response for a query embedding.
+
+        Args:
+            embedding (list): Query embedding
+
+        Returns:
+            str: Cached response or None on a miss
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return None
+
+        with self._lock:
+            if self._planes is not None and self._planes.shape[2] != vector.shape[0]:
+                self.misses += 1
+                return None
+
+            candidates = set()
+            for table, key in zip(self._tables, self._bucket_keys(vector)):
+                candidates.update(table.get(key, ()))
+
+            best_id, best_score = None, self.similarity_threshold
+            for entry_id in candidates:
+                score = float(self._entries[entry_id][0] @ vector)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][1]
+
+    def set(self, embedding, response):
+        """
+        Store a response for a query embedding.
+
+        Args:
+            embedding (list): Query embedding
+            response (str): Response to cache
+
+        Returns:
+            bool: Whether the response was cached
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return False
+
+        with self._lock:
+            if self._planes is not None and self._planes.shape[2] != vector.shape[0]:
+                logging.warning("SemanticCache: embedding dimension mismatch, not caching")
+                return False
+
+            keys = self._bucket_keys(vector)
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._entries[entry_id] = (vector, response, keys)
+            for table, key in zip(self._tables, keys):
+                table.setdefault(key, []).append(entry_id)
+
+            # Evict least recently used entries
+            while len(self._entries) > self.max_entries:
+                old_id, (_, _, old_keys) = self._entries.popitem(last=False)
+                for table, key in zip(self._tables, old_keys):
+                    bucket = table.get(key)
+                    if bucket:
+                        bucket.remove(old_id)
+                        if not bucket:
+                            del table[key]
+
+        return True
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._tables = [dict() for _ in range(self.num_tables)]
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
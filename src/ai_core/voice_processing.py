@@ -95,6 +95,12 @@ class VoiceAssistant:
         
         return False
     
+    def _reset(self):
+        """
+        Clear per-session state so an existing instance can be reused.
+        """
+        self.is_listening = False
+    
     def listen(self, timeout=5, phrase_time_limit=None):
         """
         Capture voice input from the microphone with improved error handling.
@@ -250,11 +256,14 @@ class VoiceAssistant:
         """
         Save audio data as a WAV file.
         """
+        # WAV PCM is little-endian; convert once so writeframes gets raw bytes
+        pcm = (np.asarray(audio_data, dtype=np.float32) * 32767).astype('<i2')
+
         with wave.open(file_path, 'wb') as wf:
             wf.setnchannels(1)
             wf.setsampwidth(2)  # 16-bit
             wf.setframerate(sample_rate)
-            wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
+            wf.writeframes(pcm.tobytes())
     
     def speak(self, text):
         """
@@ -40,27 +40,32 @@ class AI_GUI(QWidget):
         
         # Title label
         self.title_label = QLabel("🤖 AI Assistant")
+        self.title_label.setObjectName("title_label")
         self.title_label.setFont(QFont("Arial", 16))
         layout.addWidget(self.title_label)
 
         # Chat display
         self.chat_display = QTextEdit(self)
+        self.chat_display.setObjectName("chat_display")
         self.chat_display.setReadOnly(True)
         layout.addWidget(self.chat_display)
 
         # Input box
         self.input_box = QLineEdit(self)
+        self.input_box.setObjectName("input_box")
         self.input_box.setPlaceholderText("Type your message here...")
         self.input_box.returnPressed.connect(self.process_input)
         layout.addWidget(self.input_box)
 
         # Send button
         self.send_button = QPushButton("💬 Send")
+        self.send_button.setObjectName("send_button")
         self.send_button.clicked.connect(self.process_input)
         layout.addWidget(self.send_button)
 
         # Voice button
         self.voice_button = QPushButton("🎙️ Speak")
+        self.voice_button.setObjectName("voice_button")
         self.voice_button.clicked.connect(self.start_voice_input)
         layout.addWidget(self.voice_button)
 
@@ -14,7 +14,7 @@ from src.ai_core.real_time_learning import SelfLearningAI
 from src.gui.main_window import AI_GUI
 from src.gui.voice_gui import VoiceGUI
 from src.platform_integration.system_control import SystemAutomation, SystemControl
-from src.task_management.babyagi_agent import TaskScheduler
+from src.task_management.task_scheduler import TaskScheduler
 from src.database.user_data import UserData
 from src.security.ai_security import AISecurity
 from src.utils.config import Config
@@ -1,18 +1,30 @@
 import logging
 import time
-import uuid
+import itertools
 import os
+import re
+import heapq
+import hashlib
 import threading
+import collections
+from types import MappingProxyType
 from src.ai_core.model_integration import AIModel
 from src.ai_core.real_time_learning import SelfLearningAI
+from src.ai_core.semantic_cache import SemanticCache
 from src.utils.config import Config
 
+# Number of recent task objectives remembered for de-duplication
+SEEN_OBJECTIVES_LIMIT = 10000
+
 class BabyAgiAgent:
     """
     An autonomous AI agent inspired by BabyAGI.
     Manages task generation, execution, and refinement with memory.
     """
     
+    # Blank-line separator between tasks in a refinement response
+    _PARA_RE = re.compile(r"\n\s*\n")
+    
     def __init__(self, model_type=None, model_path=None):
         """
         Initialize the BabyAGI agent.
@@ -28,10 +40,20 @@ class BabyAgiAgent:
         # Initialize components
         self.ai_model = AIModel(model_type, model_path)
         self.memory = SelfLearningAI()
+        self.response_cache = SemanticCache(
+            similarity_threshold=Config.get("semantic_cache_threshold", 0.95)
+        )
         self.task_queue = []
-        self.history = []
+        self._by_id = {}
+        self._id_counter = itertools.count(1)
+        self._pending_heap = []  # (-priority, created_at, task_id)
+        self._stale_heap_entries = 0
+        self._seen_objectives = collections.OrderedDict()  # objective hash -> task_id
+        # deque.append is atomic, so history needs no lock
+        self.history = collections.deque(maxlen=1000)
+        self._recent_history = collections.deque(maxlen=5)  # feeds refine_tasks
         self.is_running = False
-        self.lock = threading.Lock()
+        self._queue_lock = threading.Lock()
         
         logging.info("BabyAGI agent initialized")
     
@@ -45,24 +67,50 @@ class BabyAgiAgent:
             priority (int): Priority level (higher = more important)
             
         Returns:
-            str: Task ID
+            int: Task ID (the existing ID if the objective was already queued)
         """
-        task_id = str(uuid.uuid4())
-        
-        with self.lock:
-            task = {
-                "id": task_id,
-                "objective": objective,
-                "type": task_type,
-                "priority": priority,
-                "status": "pending",
-                "created_at": time.time(),
-                "completed_at": None,
-                "result": None
-            }
+        with self._queue_lock:
+            return self._add_task_locked(objective, task_type, priority)
+    
+    def _add_task_locked(self, objective, task_type="general", priority=1):
+        """
+        Add a task to the queue. Must be called with the queue lock held.
+        
+        Args:
+            objective (str): Task objective/description
+            task_type (str): Type of task
+            priority (int): Priority level (higher = more important)
             
-            self.task_queue.append(task)
-            logging.info(f"Task added: {objective} (ID: {task_id})")
+        Returns:
+            int: Task ID (the existing ID if the objective was already queued)
+        """
+        key = hashlib.sha1(objective.strip().lower().encode("utf-8")).digest()
+        existing_id = self._seen_objectives.get(key)
+        if existing_id is not None:
+            self._seen_objectives.move_to_end(key)
+            logging.info(f"Skipping duplicate task: {objective} (ID: {existing_id})")
+            return existing_id
+        
+        task_id = next(self._id_counter)
+        self._seen_objectives[key] = task_id
+        if len(self._seen_objectives) > SEEN_OBJECTIVES_LIMIT:
+            self._seen_objectives.popitem(last=False)
+        
+        task = {
+            "id": task_id,
+            "objective": objective,
+            "type": task_type,
+            "priority": priority,
+            "status": "pending",
+            "created_at": time.time(),
+            "completed_at": None,
+            "result": None
+        }
+        
+        self.task_queue.append(task)
+        self._by_id[task_id] = task
+        heapq.heappush(self._pending_heap, (-priority, task["created_at"], task_id))
+        logging.info(f"Task added: {objective} (ID: {task_id})")
         
         return task_id
     
@@ -71,16 +119,13 @@ class BabyAgiAgent:
         Get a task by ID.
         
         Args:
-            task_id (str): Task ID
+            task_id (int): Task ID
             
         Returns:
-            dict: Task data or None if not found
+            MappingProxyType: Read-only view of the task or None if not found
         """
-        with self.lock:
-            for task in self.task_queue:
-                if task["id"] == task_id:
-                    return task.copy()
-        return None
+        task = self._by_id.get(task_id)
+        return MappingProxyType(task) if task else None
     
     def get_tasks(self, status=None):
         """
@@ -90,47 +135,64 @@ class BabyAgiAgent:
             status (str, optional): Filter by status
             
         Returns:
-            list: List of tasks
+            list: Read-only views of the tasks (no per-task copies)
         """
-        with self.lock:
+        with self._queue_lock:
             if status:
-                return [task.copy() for task in self.task_queue if task["status"] == status]
+                return [MappingProxyType(task) for task in self.task_queue if task["status"] == status]
             else:
-                return [task.copy() for task in self.task_queue]
+                return [MappingProxyType(task) for task in self.task_queue]
+    
+    def _compact_pending_heap(self):
+        """
+        Drop heap entries for tasks that are no longer pending.
+        Must be called with the queue lock held.
+        """
+        self._pending_heap = [
+            entry for entry in self._pending_heap
+            if self._by_id[entry[2]]["status"] == "pending"
+        ]
+        heapq.heapify(self._pending_heap)
+        self._stale_heap_entries = 0
     
     def execute_task(self, task_id=None):
         """
         Execute a specific task or the highest priority pending task.
         
         Args:
-            task_id (str, optional): Task ID to execute
+            task_id (int, optional): Task ID to execute
             
         Returns:
             dict: Execution result with task info
         """
-        with self.lock:
+        with self._queue_lock:
             # Find the task to execute
             task = None
-            if task_id:
+            if task_id is not None:
                 # Find by ID
-                for t in self.task_queue:
-                    if t["id"] == task_id and t["status"] == "pending":
-                        task = t
-                        break
-                
-                if not task:
+                task = self._by_id.get(task_id)
+                if not task or task["status"] != "pending":
                     logging.warning(f"Task {task_id} not found or not pending")
                     return {"success": False, "error": "Task not found or not pending"}
+                
+                # Its heap entry is now stale; compact once those dominate
+                self._stale_heap_entries += 1
+                if self._stale_heap_entries > 64 and self._stale_heap_entries * 2 > len(self._pending_heap):
+                    self._compact_pending_heap()
             else:
-                # Find highest priority pending task
-                pending_tasks = [t for t in self.task_queue if t["status"] == "pending"]
-                if not pending_tasks:
+                # Pop highest priority pending task, skipping entries for
+                # tasks that were already executed by ID
+                while self._pending_heap:
+                    _, _, heap_task_id = heapq.heappop(self._pending_heap)
+                    candidate = self._by_id.get(heap_task_id)
+                    if candidate and candidate["status"] == "pending":
+                        task = candidate
+                        break
+                    self._stale_heap_entries = max(0, self._stale_heap_entries - 1)
+                
+                if not task:
                     logging.info("No pending tasks to execute")
                     return {"success": False, "error": "No pending tasks"}
-                
-                # Sort by priority (highest first)
-                pending_tasks.sort(key=lambda x: x["priority"], reverse=True)
-                task = pending_tasks[0]
             
             # Mark as in progress
             task["status"] = "in_progress"
@@ -140,33 +202,46 @@ class BabyAgiAgent:
         
         try:
             # Get context from memory
-            context = self.memory.retrieve_context(task["objective"])
+            # Normalize the objective so trivially different phrasings share cached embeddings
+            normalized_objective = task["objective"].strip().lower()
+            context = self.memory.retrieve_context(normalized_objective)
             
-            # Prepare prompt
-            prompt = f"Task: {task['objective']}\n\n"
-            if context:
-                prompt += f"Context:\n{context}\n\n"
-            prompt += "Execute this task and provide a detailed response."
+            # Prepare prompt in a single join
+            prompt = "".join((
+                "Task: ", task["objective"], "\n\n",
+                *(("Context:\n", context, "\n\n") if context else ()),
+                "Execute this task and provide a detailed response."
+            ))
             
-            # Generate response
-            response = self.ai_model.generate_response(prompt)
+            # Reuse a cached response for semantically equivalent objectives; the
+            # context block and instructions are shared text that would inflate similarity
+            objective_embedding = self.memory.generate_embedding(normalized_objective)
+            response = self.response_cache.get(objective_embedding)
             
-            # Store in memory
-            self.memory.store_interaction(prompt, response)
+            if response is None:
+                # Generate response
+                response = self.ai_model.generate_response(prompt)
+                self.response_cache.set(objective_embedding, response)
+                
+                # Store in memory
+                self.memory.store_interaction(prompt, response)
+            else:
+                logging.info(f"Semantic cache hit for task {task['id']}")
             
             # Update task with result
-            with self.lock:
-                task["status"] = "completed"
-                task["completed_at"] = time.time()
-                task["result"] = response
-                
-                # Add to history
-                self.history.append({
-                    "task_id": task["id"],
-                    "objective": task["objective"],
-                    "result": response,
-                    "completed_at": task["completed_at"]
-                })
+            task["result"] = response
+            task["completed_at"] = time.time()
+            task["status"] = "completed"
+            
+            # Add to history
+            entry = {
+                "task_id": task["id"],
+                "objective": task["objective"],
+                "result": response,
+                "completed_at": task["completed_at"]
+            }
+            self.history.append(entry)
+            self._recent_history.append(entry)
             
             logging.info(f"Task completed: {task['objective']} (ID: {task['id']})")
             return {
@@ -178,9 +253,8 @@ class BabyAgiAgent:
             logging.error(f"Error executing task {task['id']}: {str(e)}")
             
             # Update task status
-            with self.lock:
-                task["status"] = "failed"
-                task["result"] = f"Error: {str(e)}"
+            task["result"] = f"Error: {str(e)}"
+            task["status"] = "failed"
             
             return {
                 "success": False,
@@ -204,7 +278,7 @@ class BabyAgiAgent:
         # Prepare prompt with task history
         history_text = "\n\n".join([
             f"Task: {h['objective']}\nResult: {h['result']}"
-            for h in self.history[-5:]  # Last 5 tasks
+            for h in self._recent_history  # Last 5 tasks
         ])
         
         prompt = f"""Based on these previously completed tasks:
@@ -218,16 +292,12 @@ Format each task as a separate paragraph with a clear objective.
         # Generate tasks
         response = self.ai_model.generate_response(prompt)
         
-        # Parse response into tasks
-        new_task_ids = []
+        # Parse response into tasks - one per paragraph
+        paragraphs = [p.strip() for p in self._PARA_RE.split(response) if p.strip()]
         
-        # Simple parsing - split by paragraphs
-        paragraphs = response.split("\n\n")
-        for i, paragraph in enumerate(paragraphs):
-            if paragraph.strip():
-                # Add as a new task with medium priority
-                task_id = self.add_task(paragraph.strip(), priority=2)
-                new_task_ids.append(task_id)
+        # Add all as new tasks with medium priority under a single lock
+        with self._queue_lock:
+            new_task_ids = [self._add_task_locked(p, priority=2) for p in paragraphs]
         
         logging.info(f"Created {len(new_task_ids)} refined tasks")
         return new_task_ids
@@ -269,6 +339,7 @@ Format each task as a separate paragraph with a clear objective.
                     time.sleep(interval)
         finally:
             self.is_running = False
+            self.memory.flush_embedding_cache()
             logging.info("BabyAGI agent run completed")
         
         return results
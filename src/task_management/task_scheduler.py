@@ -1,9 +1,9 @@
 import time
 import threading
 import logging
-import datetime
-import sched
-import uuid
+import heapq
+import itertools
+import concurrent.futures
 from src.utils.config import Config
 
 class TaskScheduler:
@@ -11,15 +11,23 @@ class TaskScheduler:
     Task scheduler for executing recurring and scheduled tasks.
     """
     
-    def __init__(self):
+    def __init__(self, max_workers=None):
         """
         Initialize the task scheduler.
+        
+        Args:
+            max_workers (int, optional): Size of the worker pool that runs task functions
         """
         self.tasks = []
+        self._by_id = {}
+        self._id_counter = itertools.count(1)
         self.running = False
-        self.scheduler = sched.scheduler(time.time, time.sleep)
+        self._heap = []  # (monotonic next_run, task_id), stale entries are skipped lazily
         self.lock = threading.Lock()
+        self._cv = threading.Condition(self.lock)
         self.scheduler_thread = None
+        self.max_workers = max_workers
+        self.pool = None  # created on first use, discarded by stop()
         logging.info("TaskScheduler initialized")
 
     def add_task(self, task_function, interval=None, schedule=None, task_name=None):
@@ -33,7 +41,7 @@ class TaskScheduler:
             task_name (str, optional): Name for the task
             
         Returns:
-            str: Task ID
+            int: Task ID
         """
         if not task_function:
             logging.error("Cannot add task: No function provided")
@@ -48,13 +56,14 @@ class TaskScheduler:
             task_name = f"Task_{len(self.tasks) + 1}"
         
         # Create task object
-        task_id = str(uuid.uuid4())
+        task_id = next(self._id_counter)
         task = {
             "id": task_id,
             "name": task_name,
             "function": task_function,
             "interval": interval,
             "schedule": schedule,
+            "_schedule_hm": self._parse_schedule(schedule) if schedule else None,
             "last_run": None,
             "next_run": None,
             "runs": 0,
@@ -63,13 +72,14 @@ class TaskScheduler:
         
         # Calculate next run time
         if interval:
-            task["next_run"] = time.time() + interval
+            task["next_run"] = time.monotonic() + interval
         elif schedule:
-            task["next_run"] = self._calculate_next_run(schedule)
+            task["next_run"] = self._calculate_next_run(task["_schedule_hm"])
         
         # Add task to list
         with self.lock:
             self.tasks.append(task)
+            self._by_id[task_id] = task
             # Schedule task
             if self.running:
                 self._schedule_task(task)
@@ -77,34 +87,52 @@ class TaskScheduler:
         logging.info(f"Added task: {task_name}, ID: {task_id}")
         return task_id
 
-    def _calculate_next_run(self, schedule):
+    def _parse_schedule(self, schedule):
         """
-        Calculate the next run time based on a schedule string.
+        Parse a schedule string once into hour and minute.
         
         Args:
             schedule (str): Schedule string (HH:MM)
             
         Returns:
-            float: Unix timestamp for next run
+            tuple: (hour, minute) or None if the schedule is invalid
         """
         try:
-            # Parse schedule
             hour, minute = map(int, schedule.split(":"))
-            
-            # Get current time
-            now = datetime.datetime.now()
-            scheduled_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            # If scheduled time is in the past, use tomorrow
-            if scheduled_time <= now:
-                scheduled_time += datetime.timedelta(days=1)
-            
-            # Convert to timestamp
-            return scheduled_time.timestamp()
+            if not (0 <= hour < 24 and 0 <= minute < 60):
+                raise ValueError("hour or minute out of range")
+            return hour, minute
         except Exception as e:
             logging.error(f"Error parsing schedule '{schedule}': {e}")
+            return None
+
+    def _calculate_next_run(self, schedule_hm):
+        """
+        Calculate the next run time for a parsed daily schedule.
+        
+        Args:
+            schedule_hm (tuple): (hour, minute) from _parse_schedule, or None
+            
+        Returns:
+            float: time.monotonic() value for next run
+        """
+        if schedule_hm is None:
             # Default to running in 1 hour
-            return time.time() + 3600
+            return time.monotonic() + 3600
+        
+        # The wall clock decides which local time it is; the delay is then
+        # applied to the monotonic clock so clock jumps don't skew scheduling
+        hour, minute = schedule_hm
+        now = time.time()
+        local = time.localtime(now)
+        seconds_since_midnight = local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec + now % 1
+        
+        # If scheduled time is in the past, use tomorrow
+        delay = hour * 3600 + minute * 60 - seconds_since_midnight
+        if delay <= 0:
+            delay += 86400
+        
+        return time.monotonic() + delay
 
     def start(self):
         """
@@ -121,6 +149,7 @@ class TaskScheduler:
         
         # Schedule all tasks
         with self.lock:
+            self._get_pool()
             for task in self.tasks:
                 if task["enabled"]:
                     self._schedule_task(task)
@@ -143,51 +172,90 @@ class TaskScheduler:
             logging.warning("TaskScheduler is not running")
             return False
         
-        self.running = False
-        
-        # Cancel all scheduled events
-        with self.lock:
-            for event in self.scheduler.queue:
-                try:
-                    self.scheduler.cancel(event)
-                except:
-                    pass
+        # Drop pending runs and wake the scheduler thread so it exits
+        with self._cv:
+            self.running = False
+            self._heap.clear()
+            self._cv.notify_all()
+            
+            # Cancel queued runs without waiting for ones in progress; start() makes a new pool
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
         
         logging.info("TaskScheduler stopped")
         return True
 
     def _run_scheduler(self):
         """
-        Run the scheduler in a loop.
+        Run the scheduler loop, sleeping until the next task is due.
         """
-        while self.running:
-            try:
-                # Run any due events
-                self.scheduler.run(blocking=False)
-                time.sleep(1)
-            except Exception as e:
-                logging.error(f"Error in scheduler: {e}")
-                time.sleep(1)
+        current_thread = threading.current_thread()
+        
+        with self._cv:
+            while self.running and self.scheduler_thread is current_thread:
+                if not self._heap:
+                    # Nothing scheduled; wait for add_task/enable_task
+                    self._cv.wait()
+                    continue
+                
+                next_run, task_id = self._heap[0]
+                delay = next_run - time.monotonic()
+                if delay > 0:
+                    self._cv.wait(delay)
+                    continue
+                
+                heapq.heappop(self._heap)
+                task = self._by_id.get(task_id)
+                
+                # Skip removed or disabled tasks and superseded entries
+                if not task or not task["enabled"] or task["next_run"] != next_run:
+                    continue
+                
+                try:
+                    self._dispatch_task(task)
+                except Exception as e:
+                    logging.error(f"Error in scheduler: {e}")
 
     def _schedule_task(self, task):
         """
-        Schedule a task for execution.
+        Schedule a task for execution. Must be called with the lock held.
         
         Args:
             task (dict): Task to schedule
         """
         if not task["enabled"]:
             return
-            
-        delay = max(0, task["next_run"] - time.time())
-        
-        # Schedule the task execution
-        self.scheduler.enter(
-            delay,
-            1,
-            self._execute_task,
-            (task,)
-        )
+        
+        heapq.heappush(self._heap, (task["next_run"], task["id"]))
+        self._cv.notify()
+
+    def _get_pool(self):
+        """
+        Return the worker pool, creating it if needed. Must be called with the lock held.
+        
+        Returns:
+            ThreadPoolExecutor: Pool that runs task functions
+        """
+        if self.pool is None:
+            self.pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="TaskScheduler"
+            )
+        return self.pool
+
+    def _dispatch_task(self, task):
+        """
+        Hand a due task to the worker pool so the scheduler thread never blocks.
+        Must be called with the lock held.
+        
+        Args:
+            task (dict): Task to execute
+        """
+        if not self.running or not task["enabled"]:
+            return
+        
+        self._get_pool().submit(self._execute_task, task)
 
     def _execute_task(self, task):
         """
@@ -211,15 +279,16 @@ class TaskScheduler:
             logging.error(f"Error executing task {task['name']}: {e}")
         
         # Reschedule if running
-        if self.running and task["enabled"]:
-            # Calculate next run time
-            if task["interval"]:
-                task["next_run"] = time.time() + task["interval"]
-            elif task["schedule"]:
-                task["next_run"] = self._calculate_next_run(task["schedule"])
-            
-            # Schedule next execution
-            self._schedule_task(task)
+        with self.lock:
+            if self.running and task["enabled"]:
+                # Calculate next run time
+                if task["interval"]:
+                    task["next_run"] = time.monotonic() + task["interval"]
+                elif task["schedule"]:
+                    task["next_run"] = self._calculate_next_run(task["_schedule_hm"])
+                
+                # Schedule next execution
+                self._schedule_task(task)
 
     def get_tasks(self):
         """
@@ -230,6 +299,9 @@ class TaskScheduler:
         """
         task_info = []
         
+        # next_run is kept on the monotonic clock; report it as a Unix timestamp
+        clock_offset = time.time() - time.monotonic()
+        
         with self.lock:
             for task in self.tasks:
                 info = {
@@ -239,7 +311,7 @@ class TaskScheduler:
                     "interval": task["interval"],
                     "schedule": task["schedule"],
                     "last_run": task["last_run"],
-                    "next_run": task["next_run"],
+                    "next_run": task["next_run"] + clock_offset if task["next_run"] is not None else None,
                     "runs": task["runs"]
                 }
                 task_info.append(info)
@@ -251,26 +323,26 @@ class TaskScheduler:
         Enable a task by ID.
         
         Args:
-            task_id (str): ID of the task to enable
+            task_id (int): ID of the task to enable
             
         Returns:
             bool: Success status
         """
         with self.lock:
-            for task in self.tasks:
-                if task["id"] == task_id:
-                    task["enabled"] = True
-                    
-                    # Schedule if running
-                    if self.running:
-                        if task["interval"]:
-                            task["next_run"] = time.time() + task["interval"]
-                        elif task["schedule"]:
-                            task["next_run"] = self._calculate_next_run(task["schedule"])
-                        self._schedule_task(task)
-                    
-                    logging.info(f"Task {task_id} enabled")
-                    return True
+            task = self._by_id.get(task_id)
+            if task:
+                task["enabled"] = True
+                
+                # Schedule if running
+                if self.running:
+                    if task["interval"]:
+                        task["next_run"] = time.monotonic() + task["interval"]
+                    elif task["schedule"]:
+                        task["next_run"] = self._calculate_next_run(task["_schedule_hm"])
+                    self._schedule_task(task)
+                
+                logging.info(f"Task {task_id} enabled")
+                return True
                     
         logging.warning(f"Task {task_id} not found")
         return False
@@ -280,17 +352,17 @@ class TaskScheduler:
         Disable a task by ID.
         
         Args:
-            task_id (str): ID of the task to disable
+            task_id (int): ID of the task to disable
             
         Returns:
             bool: Success status
         """
         with self.lock:
-            for task in self.tasks:
-                if task["id"] == task_id:
-                    task["enabled"] = False
-                    logging.info(f"Task {task_id} disabled")
-                    return True
+            task = self._by_id.get(task_id)
+            if task:
+                task["enabled"] = False
+                logging.info(f"Task {task_id} disabled")
+                return True
                     
         logging.warning(f"Task {task_id} not found")
         return False
@@ -300,23 +372,19 @@ class TaskScheduler:
         Immediately run a task by ID.
         
         Args:
-            task_id (str): ID of the task to run
+            task_id (int): ID of the task to run
             
         Returns:
             bool: Success status
         """
         with self.lock:
-            for task in self.tasks:
-                if task["id"] == task_id:
-                    # Run in a separate thread to avoid blocking
-                    threading.Thread(
-                        target=self._execute_task_now,
-                        args=(task,),
-                        daemon=True
-                    ).start()
-                    
-                    logging.info(f"Task {task_id} started immediately")
-                    return True
+            task = self._by_id.get(task_id)
+            if task:
+                # Run on the worker pool to avoid blocking
+                self._get_pool().submit(self._execute_task_now, task)
+                
+                logging.info(f"Task {task_id} started immediately")
+                return True
                     
         logging.warning(f"Task {task_id} not found")
         return False
@@ -344,18 +412,18 @@ class TaskScheduler:
         Remove a task by ID.
         
         Args:
-            task_id (str): ID of the task to remove
+            task_id (int): ID of the task to remove
             
         Returns:
             bool: Success status
         """
         with self.lock:
-            for i, task in enumerate(self.tasks):
-                if task["id"] == task_id:
-                    # Remove task
-                    self.tasks.pop(i)
-                    logging.info(f"Task {task_id} removed")
-                    return True
+            task = self._by_id.pop(task_id, None)
+            if task:
+                # Remove task
+                self.tasks.remove(task)
+                logging.info(f"Task {task_id} removed")
+                return True
                     
         logging.warning(f"Task {task_id} not found")
         return False
\ No newline at end of file
@@ -1,120 +1,421 @@
 import os
 import logging
+from collections.abc import Iterator
 import pandas as pd
 from src.utils.config import Config
 
+logger = logging.getLogger(__name__)
+
 # Check if datasets is available
 try:
-    from datasets import load_dataset
+    from datasets import IterableDataset, load_dataset
     DATASETS_AVAILABLE = True
 except ImportError:
     DATASETS_AVAILABLE = False
-    logging.warning("datasets module not available. Hugging Face dataset loading will be limited.")
+    logger.warning("datasets module not available. Hugging Face dataset loading will be limited.")
+
+# Check if pyarrow is available for faster CSV parsing
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Block size for the multi-threaded pyarrow CSV parser
+CSV_BLOCK_SIZE = 64 << 20
+
+# Rows per record batch when scanning with pyarrow.dataset
+SCAN_BATCH_ROWS = 65536
+
+# Target size of each file when saving a sharded Parquet dataset
+PARQUET_SHARD_BYTES = 128 << 20
+
+def _arrow_column_types(dtype):
+    """
+    Convert a pandas-style dtype mapping to pyarrow column types.
+    
+    Args:
+        dtype (dict): Column name to pandas/numpy dtype
+        
+    Returns:
+        dict: Column name to pyarrow type
+    """
+    column_types = {}
+    for column, column_dtype in dtype.items():
+        if isinstance(column_dtype, pd.ArrowDtype):
+            column_types[column] = column_dtype.pyarrow_dtype
+        elif column_dtype in (str, "str", "string", object, "object"):
+            column_types[column] = pyarrow.string()
+        else:
+            column_types[column] = pyarrow.from_numpy_dtype(column_dtype)
+    return column_types
+
+def _has_text(examples, text_column):
+    """
+    Batched filter predicate keeping examples with non-blank text.
+    
+    Args:
+        examples (dict): Batched examples
+        text_column (str): Name of the text column
+        
+    Returns:
+        list: One bool per example
+    """
+    return [bool(text) and not text.isspace() for text in examples[text_column]]
 
 class DatasetLoader:
     """
     Data loader for training AI models.
     """
     
-    def __init__(self, dataset_name=None, data_dir=None):
+    def __init__(self, dataset_name=None, data_dir=None, streaming=False):
         """
         Initialize the dataset loader.
         
         Args:
             dataset_name (str): Name of Hugging Face dataset
             data_dir (str): Directory for data files
+            streaming (bool): Stream Hugging Face datasets by default
         """
         self.dataset_name = dataset_name or "wikitext"
+        self.streaming = streaming
         self.data_dir = data_dir or Config.get("data_dir", "data")
         
         # Create data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
         
-        logging.info(f"DatasetLoader initialized for dataset: {self.dataset_name}")
+        logger.info("DatasetLoader initialized for dataset: %s", self.dataset_name)
 
-    def load_huggingface_dataset(self, split="train"):
+    def load_huggingface_dataset(self, split="train", streaming=None):
         """
         Load a dataset from Hugging Face datasets.
         
         Args:
             split (str): Dataset split (train, test, validation)
+            streaming (bool, optional): Stream examples lazily instead of materializing
+                the split; defaults to the loader's setting
             
         Returns:
-            object: Loaded dataset or None if unavailable
+            object: Loaded dataset (IterableDataset when streaming) or None if unavailable
         """
+        if streaming is None:
+            streaming = self.streaming
+            
         if not DATASETS_AVAILABLE:
-            logging.error("Cannot load Hugging Face dataset: datasets module not available")
+            logger.error("Cannot load Hugging Face dataset: datasets module not available")
             return None
             
         try:
-            logging.info(f"Loading Hugging Face dataset: {self.dataset_name} ({split})")
-            dataset = load_dataset(self.dataset_name, split=split)
+            logger.info("Loading Hugging Face dataset: %s (%s, streaming=%s)", self.dataset_name, split, streaming)
+            dataset = load_dataset(self.dataset_name, split=split, streaming=streaming)
             return dataset
         except Exception as e:
-            logging.error(f"Error loading dataset: {e}")
+            logger.error("Error loading dataset: %s", e)
             return None
 
-    def load_csv_dataset(self, file_path=None):
+    def load_csv_dataset(self, file_path=None, usecols=None, dtype=None, chunksize=None,
+                         filter_expr=None, lazy=False):
         """
-        Load a dataset from a CSV file.
+        Load a dataset from a CSV file. Parquet files are detected by extension
+        and read with pyarrow instead.
         
         Args:
-            file_path (str): Path to the CSV file
+            file_path (str): Path to the CSV or Parquet file
+            usecols (list, optional): Columns to load; others are skipped at parse time
+            dtype (dict, optional): Column dtypes, avoids type inference
+            chunksize (int, optional): Rows per chunk; returns an iterator of DataFrames
+            filter_expr (pyarrow.compute.Expression, optional): Row filter applied
+                while scanning, e.g. pc.field("text").is_valid()
+            lazy (bool): Return a pyarrow.dataset Scanner instead of a DataFrame
             
         Returns:
-            DataFrame: Loaded dataset or None if unavailable
+            DataFrame: Loaded dataset (or chunk iterator or Scanner) or None if unavailable
         """
-        # If file_path is not provided, look in the data directory
+        # If file_path is not provided, look in the data directory, preferring Parquet
         if file_path is None:
-            file_path = os.path.join(self.data_dir, "dataset.csv")
+            file_path = os.path.join(self.data_dir, "dataset.parquet")
+            if not os.path.exists(file_path):
+                file_path = os.path.join(self.data_dir, "dataset.csv")
+            
+        # Scan with column pruning and predicate pushdown instead of loading everything
+        if lazy or filter_expr is not None:
+            return self._scan_dataset(file_path, usecols, dtype, filter_expr, lazy)
+            
+        if file_path.endswith(".parquet"):
+            if chunksize is not None and PYARROW_AVAILABLE and os.path.exists(file_path):
+                return self._iter_parquet_chunks(file_path, usecols, chunksize)
+            return self.load_parquet_dataset(file_path, columns=usecols)
             
         if not os.path.exists(file_path):
-            logging.error(f"CSV file not found: {file_path}")
+            logger.error("CSV file not found: %s", file_path)
             return None
         
         try:
-            logging.info(f"Loading CSV dataset: {file_path}")
-            df = pd.read_csv(file_path)
+            logger.info("Loading CSV dataset: %s", file_path)
+            
+            # The pyarrow engine is multi-threaded but does not support chunked reads
+            if chunksize is not None:
+                return pd.read_csv(file_path, usecols=usecols, dtype=dtype, chunksize=chunksize,
+                                   engine="c", low_memory=False)
+            
+            if PYARROW_AVAILABLE:
+                # Block-parallel parse; strings stay in Arrow buffers instead of Python objects
+                table = pa_csv.read_csv(
+                    file_path,
+                    read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True),
+                    # Blank string cells stay NaN, as with pd.read_csv
+                    convert_options=pa_csv.ConvertOptions(
+                        include_columns=usecols,
+                        column_types=_arrow_column_types(dtype) if isinstance(dtype, dict) else None,
+                        strings_can_be_null=True
+                    )
+                )
+                df = table.to_pandas(types_mapper=pd.ArrowDtype)
+                if dtype is not None and not isinstance(dtype, dict):
+                    df = df.astype(dtype)
+            else:
+                df = pd.read_csv(file_path, usecols=usecols, dtype=dtype)
             return df
         except Exception as e:
-            logging.error(f"Error loading CSV: {e}")
+            logger.error("Error loading CSV: %s", e)
             return None
 
-    def save_dataset(self, dataset, file_name=None):
+    def _scan_dataset(self, file_path, columns, dtype, filter_expr, lazy):
         """
-        Save a dataset to a CSV file.
+        Read a CSV or Parquet dataset through a pyarrow.dataset scanner.
         
         Args:
-            dataset: Dataset to save (DataFrame or Hugging Face dataset)
+            file_path (str): Path to the file or shard directory
+            columns (list, optional): Columns to read
+            dtype (dict, optional): Column dtypes for CSV files
+            filter_expr (pyarrow.compute.Expression, optional): Row filter
+            lazy (bool): Return the Scanner instead of a DataFrame
+            
+        Returns:
+            object: Scanner or DataFrame, or None if unavailable
+        """
+        if not PYARROW_AVAILABLE:
+            logger.error("Cannot scan dataset: pyarrow not available")
+            return None
+            
+        if not os.path.exists(file_path):
+            logger.error("Dataset file not found: %s", file_path)
+            return None
+            
+        try:
+            logger.info("Scanning dataset: %s", file_path)
+            if file_path.endswith(".parquet"):
+                file_format = "parquet"
+            else:
+                # Blank string cells become nulls, so is_valid() filters drop them
+                file_format = pa_ds.CsvFileFormat(
+                    read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types=_arrow_column_types(dtype) if isinstance(dtype, dict) else None,
+                        strings_can_be_null=True
+                    )
+                )
+            scanner = pa_ds.dataset(file_path, format=file_format).scanner(
+                columns=columns,
+                filter=filter_expr,
+                batch_size=SCAN_BATCH_ROWS
+            )
+            if lazy:
+                return scanner
+            return scanner.to_table().to_pandas(types_mapper=pd.ArrowDtype)
+        except Exception as e:
+            logger.error("Error scanning dataset: %s", e)
+            return None
+
+    def _iter_parquet_chunks(self, file_path, columns, chunksize):
+        """
+        Read a Parquet file as DataFrame chunks of at most chunksize rows.
+        
+        Args:
+            file_path (str): Path to the Parquet file
+            columns (list, optional): Columns to load
+            chunksize (int): Rows per chunk
+            
+        Returns:
+            iterator: DataFrame chunks
+        """
+        logger.info("Loading Parquet dataset in chunks: %s", file_path)
+        # Works for single files and for shard directories written by save_dataset
+        parquet_data = pa_ds.dataset(file_path, format="parquet")
+        return (
+            batch.to_pandas(types_mapper=pd.ArrowDtype)
+            for batch in parquet_data.to_batches(columns=columns, batch_size=chunksize)
+        )
+
+    def load_parquet_dataset(self, file_path=None, columns=None):
+        """
+        Load a dataset from a Parquet file.
+        
+        Args:
+            file_path (str): Path to the Parquet file or shard directory
+            columns (list, optional): Columns to load
+            
+        Returns:
+            DataFrame: Loaded dataset or None if unavailable
+        """
+        if file_path is None:
+            file_path = os.path.join(self.data_dir, "dataset.parquet")
+            
+        if not os.path.exists(file_path):
+            logger.error("Parquet file not found: %s", file_path)
+            return None
+        
+        try:
+            logger.info("Loading Parquet dataset: %s", file_path)
+            return pd.read_parquet(file_path, columns=columns, engine="pyarrow")
+        except Exception as e:
+            logger.error("Error loading Parquet: %s", e)
+            return None
+
+    def save_dataset(self, dataset, file_name=None, format="parquet", shard_size=None):
+        """
+        Save a dataset to a Parquet or CSV file.
+        
+        Args:
+            dataset: Dataset to save (DataFrame, iterator of DataFrame chunks,
+                or Hugging Face dataset)
             file_name (str): Name of the output file
+            format (str): Output format, "parquet" or "csv"
+            shard_size (int, optional): Write Parquet as a directory of files of about
+                this many bytes each (e.g. PARQUET_SHARD_BYTES) for parallel readers
             
         Returns:
-            str: Path to the saved file or None if failed
+            str: Path to the saved file (or shard directory) or None if failed
         """
+        if format not in ("parquet", "csv"):
+            logger.error("Unsupported output format: %s", format)
+            return None
+            
         if file_name is None:
-            file_name = "dataset.csv"
+            file_name = f"dataset.{format}"
             
         file_path = os.path.join(self.data_dir, file_name)
         
         try:
+            if shard_size is not None and format == "parquet":
+                self._save_parquet_shards(dataset, file_path, shard_size)
+                logger.info("Dataset saved to %s", file_path)
+                return file_path
+                
             # Handle different dataset types
             if isinstance(dataset, pd.DataFrame):
                 # Pandas DataFrame
-                dataset.to_csv(file_path, index=False)
+                if format == "parquet" and PYARROW_AVAILABLE:
+                    table = pyarrow.Table.from_pandas(dataset, preserve_index=False)
+                    pq.write_table(table, file_path, compression="snappy", use_dictionary=True)
+                elif format == "parquet":
+                    dataset.to_parquet(file_path, compression="snappy", index=False)
+                else:
+                    dataset.to_csv(file_path, index=False)
+            elif isinstance(dataset, Iterator):
+                # DataFrame chunks, written one at a time
+                self._save_chunks(dataset, file_path, format)
             elif DATASETS_AVAILABLE and hasattr(dataset, "to_pandas"):
                 # Hugging Face dataset
-                df = dataset.to_pandas()
-                df.to_csv(file_path, index=False)
+                if format == "parquet":
+                    # Written shard by shard, without materializing a DataFrame
+                    dataset.to_parquet(file_path, compression="snappy")
+                else:
+                    df = dataset.to_pandas()
+                    df.to_csv(file_path, index=False)
             else:
-                logging.error("Unsupported dataset type")
+                logger.error("Unsupported dataset type")
                 return None
                 
-            logging.info(f"Dataset saved to {file_path}")
+            logger.info("Dataset saved to %s", file_path)
             return file_path
         except Exception as e:
-            logging.error(f"Error saving dataset: {e}")
+            logger.error("Error saving dataset: %s", e)
             return None
 
+    def _save_chunks(self, chunks, file_path, format):
+        """
+        Write DataFrame chunks to a single file without holding them all in memory.
+        
+        Args:
+            chunks (iterator): DataFrame chunks
+            file_path (str): Output file path
+            format (str): Output format, "parquet" or "csv"
+        """
+        if format == "parquet":
+            if not PYARROW_AVAILABLE:
+                raise ImportError("pyarrow is required to write chunked Parquet files")
+            writer = None
+            try:
+                for chunk in chunks:
+                    table = pyarrow.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(file_path, table.schema, compression="snappy")
+                    else:
+                        # Chunks infer types independently; keep the first chunk's schema
+                        table = table.cast(writer.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(file_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+    def _save_parquet_shards(self, dataset, dir_path, shard_size):
+        """
+        Write a dataset as numbered Parquet files of roughly shard_size bytes.
+        
+        Args:
+            dataset: DataFrame, iterator of DataFrame chunks, or Hugging Face dataset
+            dir_path (str): Output directory
+            shard_size (int): Target bytes per file, measured in memory
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to write sharded Parquet files")
+            
+        # Feed Arrow tables of at most ~1/8 shard so files close near the target size
+        if isinstance(dataset, pd.DataFrame):
+            bytes_per_row = max(1, dataset.memory_usage(deep=True).sum() // max(1, len(dataset)))
+            rows = max(1, shard_size // bytes_per_row // 8)
+            tables = (
+                pyarrow.Table.from_pandas(dataset.iloc[i:i + rows], preserve_index=False)
+                for i in range(0, len(dataset), rows)
+            )
+        elif isinstance(dataset, Iterator):
+            tables = (pyarrow.Table.from_pandas(chunk, preserve_index=False) for chunk in dataset)
+        elif DATASETS_AVAILABLE and hasattr(dataset, "with_format"):
+            tables = dataset.with_format("arrow").iter(batch_size=10_000)
+        else:
+            raise TypeError("Unsupported dataset type")
+            
+        os.makedirs(dir_path, exist_ok=True)
+        writer, schema, written, shard = None, None, 0, 0
+        try:
+            for table in tables:
+                if schema is None:
+                    schema = table.schema
+                else:
+                    table = table.cast(schema)
+                    
+                if writer is not None and written >= shard_size:
+                    writer.close()
+                    writer, written = None, 0
+                if writer is None:
+                    shard_path = os.path.join(dir_path, f"dataset_{shard:05d}.parquet")
+                    writer = pq.ParquetWriter(shard_path, schema, compression="snappy")
+                    shard += 1
+                    
+                writer.write_table(table)
+                written += table.nbytes
+        finally:
+            if writer is not None:
+                writer.close()
+
     def preprocess_dataset(self, dataset, text_column="text"):
         """
         Preprocess a dataset for training.
@@ -124,22 +425,51 @@ class DatasetLoader:
             text_column (str): Name of the text column
             
         Returns:
-            object: Preprocessed dataset
+            object: Preprocessed dataset (a lazy chunk iterator for chunked or scanned input)
         """
         try:
+            # For lazy scans, preprocess one record batch at a time
+            if PYARROW_AVAILABLE and isinstance(dataset, pa_ds.Scanner):
+                return (
+                    self.preprocess_dataset(batch.to_pandas(types_mapper=pd.ArrowDtype), text_column)
+                    for batch in dataset.to_batches()
+                )
+                
+            # For chunked CSV reads, preprocess each chunk as it is consumed
+            if isinstance(dataset, Iterator):
+                return (self.preprocess_dataset(chunk, text_column) for chunk in dataset)
+                
             # For pandas DataFrame
             if isinstance(dataset, pd.DataFrame):
-                # Basic preprocessing: remove null values, strip whitespace
+                # Basic preprocessing: strip whitespace, remove null and empty values
                 if text_column in dataset.columns:
-                    dataset = dataset.dropna(subset=[text_column])
-                    dataset[text_column] = dataset[text_column].str.strip()
+                    if PYARROW_AVAILABLE:
+                        # Arrow kernels work on the string buffers without boxing Python objects
+                        text = pyarrow.array(dataset[text_column], from_pandas=True)
+                        trimmed = pc.utf8_trim_whitespace(text)
+                        keep = pc.fill_null(pc.greater(pc.utf8_length(trimmed), 0), False)
+                        dataset = dataset[keep.to_numpy(zero_copy_only=False)].copy()
+                        dataset[text_column] = pd.Series(
+                            trimmed.filter(keep), dtype=pd.ArrowDtype(trimmed.type), index=dataset.index
+                        )
+                    else:
+                        stripped = dataset[text_column].str.strip()
+                        keep = stripped.str.len() > 0
+                        dataset = dataset[keep].copy()
+                        dataset[text_column] = stripped[keep]
                     
             # For Hugging Face dataset
             elif DATASETS_AVAILABLE and hasattr(dataset, "filter"):
-                # Remove empty or null examples
-                dataset = dataset.filter(lambda example: example[text_column] is not None and len(example[text_column].strip()) > 0)
+                # Remove empty or null examples, a batch per call; streaming datasets filter in-process
+                filter_kwargs = {} if isinstance(dataset, IterableDataset) else {"num_proc": os.cpu_count()}
+                dataset = dataset.filter(
+                    _has_text,
+                    batched=True,
+                    fn_kwargs={"text_column": text_column},
+                    **filter_kwargs
+                )
             
             return dataset
         except Exception as e:
-            logging.error(f"Error preprocessing dataset: {e}")
+            logger.error("Error preprocessing dataset: %s", e)
             return dataset  # Return original dataset on error
\ No newline at end of file
@@ -1,8 +1,23 @@
 import os
+import json
+import glob
+import hashlib
 import logging
-import torch
+import itertools
+import multiprocessing
+import numpy as np
 from src.utils.config import Config
 
+logger = logging.getLogger(__name__)
+
+# Check if torch is available
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+    logger.warning("torch module not available. Model training will be disabled.")
+
 # Check if transformers is available
 try:
     import transformers
@@ -10,14 +25,142 @@ try:
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
-    logging.warning("transformers module not available. Model training will be limited.")
+    logger.warning("transformers module not available. Model training will be limited.")
+
+# Check if datasets is available
+try:
+    from datasets import Features, IterableDataset, Sequence, Value, load_from_disk
+    DATASETS_AVAILABLE = True
+except ImportError:
+    DATASETS_AVAILABLE = False
+
+# Tokens per shard written by TrainModel.pretokenize_to_bin
+PRETOKENIZE_SHARD_TOKENS = 100_000_000
+
+# Tokens per packed training example
+BLOCK_SIZE = 512
+
+def _tokenize_examples(examples, tokenizer):
+    """
+    Tokenize a batch of text examples without padding or truncation.
+    Kept at module level so dataset.map workers receive only the tokenizer.
+    
+    Args:
+        examples (dict): Batched examples with a "text" list
+        tokenizer: Fast tokenizer
+        
+    Returns:
+        dict: Tokenized examples, each terminated by the EOS token
+    """
+    eos = [tokenizer.eos_token_id] if tokenizer.eos_token_id is not None else []
+    encoded = tokenizer(
+        examples["text"],
+        truncation=False,
+        padding=False,
+        return_attention_mask=False,
+        return_token_type_ids=False
+    )
+    return {"input_ids": [ids + eos for ids in encoded["input_ids"]]}
+
+def _group_texts(examples, block_size=BLOCK_SIZE):
+    """
+    Concatenate a batch of tokenized examples and split it into fixed-size blocks.
+    The remainder that does not fill a whole block is dropped.
+    
+    Args:
+        examples (dict): Batched examples with an "input_ids" list
+        block_size (int): Tokens per block
+        
+    Returns:
+        dict: Packed examples
+    """
+    tokens = np.fromiter(itertools.chain.from_iterable(examples["input_ids"]), dtype=np.int64)
+    num_blocks = len(tokens) // block_size
+    blocks = tokens[: num_blocks * block_size].reshape(num_blocks, block_size)
+    return {"input_ids": blocks.tolist()}
+
+def _collate_blocks(features):
+    """
+    Stack packed blocks into a batch. Nothing is padded, so no attention mask is
+    needed; causal LM models shift labels internally, so labels equal input_ids.
+    
+    Args:
+        features (list): Examples with fixed-length "input_ids"
+        
+    Returns:
+        dict: Batch tensors
+    """
+    input_ids = torch.stack([torch.as_tensor(f["input_ids"]) for f in features]).long()
+    return {"input_ids": input_ids, "labels": input_ids.clone()}
+
+# Tokenizer used by pretokenization worker processes
+_worker_tokenizer = None
+
+def _init_tokenize_worker(tokenizer):
+    """Store the tokenizer in a pretokenization worker process."""
+    global _worker_tokenizer
+    _worker_tokenizer = tokenizer
+
+def _tokenize_batch(args):
+    """
+    Tokenize a batch of texts into one flat token array.
+    Documents are separated by the EOS token so they can be packed tightly.
+    
+    Args:
+        args (tuple): (texts, numpy dtype name)
+        
+    Returns:
+        ndarray: Concatenated token ids
+    """
+    texts, dtype = args
+    eos = [_worker_tokenizer.eos_token_id] if _worker_tokenizer.eos_token_id is not None else []
+    encoded = _worker_tokenizer(texts, truncation=False, padding=False)["input_ids"]
+    return np.fromiter(
+        itertools.chain.from_iterable(ids + eos for ids in encoded),
+        dtype=dtype
+    )
+
+class PackedTokenDataset(torch.utils.data.Dataset if TORCH_AVAILABLE else object):
+    """
+    Fixed-length token blocks read from a memory-mapped tokens.bin file.
+    """
+    
+    def __init__(self, bin_path, block_size=BLOCK_SIZE):
+        """
+        Initialize the packed dataset.
+        
+        Args:
+            bin_path (str): Path to tokens.bin written by pretokenize_to_bin
+            block_size (int): Tokens per training example
+        """
+        with open(os.path.splitext(bin_path)[0] + ".json", "r") as f:
+            meta = json.load(f)
+        
+        self.bin_path = bin_path
+        self.block_size = block_size
+        self.dtype = np.dtype(meta["dtype"])
+        self.num_blocks = meta["num_tokens"] // block_size
+        self._blocks = None
+    
+    def __len__(self):
+        return self.num_blocks
+    
+    def __getitem__(self, idx):
+        # Map lazily so each DataLoader worker opens its own view
+        if self._blocks is None:
+            tokens = np.memmap(self.bin_path, dtype=self.dtype, mode="r")
+            self._blocks = tokens[: self.num_blocks * self.block_size].reshape(-1, self.block_size)
+        
+        # Causal LM models shift labels internally, so labels equal input_ids
+        input_ids = torch.from_numpy(self._blocks[idx].astype(np.int64))
+        return {"input_ids": input_ids, "labels": input_ids.clone()}
 
 class TrainModel:
     """
     Class for training and fine-tuning language models.
     """
     
-    def __init__(self, model_name=None, dataset_name=None, save_path=None):
+    def __init__(self, model_name=None, dataset_name=None, save_path=None, streaming=False):
         """
         Initialize the model trainer.
         
@@ -25,9 +168,11 @@ class TrainModel:
             model_name (str): Base model name
             dataset_name (str): Dataset name
             save_path (str): Path to save the trained model
+            streaming (bool): Stream the dataset instead of loading it fully
         """
         self.model_name = model_name or "gpt2"
         self.dataset_name = dataset_name or "wikitext"
+        self.streaming = streaming
         self.save_path = save_path or os.path.join(Config.get("models_dir", "models"), "trained_model")
         
         # Create save directory if it doesn't exist
@@ -36,24 +181,32 @@ class TrainModel:
         # Initialize model and tokenizer if transformers is available
         if TRANSFORMERS_AVAILABLE:
             try:
-                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                # Causal generation pads on the left so new tokens follow the prompt
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True, padding_side="left")
+                if not self.tokenizer.is_fast:
+                    # Still usable; batched tokenization just encodes examples one by one
+                    logger.warning("No fast tokenizer available for %s; tokenization will be slower", self.model_name)
+                # Needed for batched generation
+                if self.tokenizer.pad_token is None:
+                    self.tokenizer.pad_token = self.tokenizer.eos_token
                 self.model = AutoModelForCausalLM.from_pretrained(self.model_name)
-                logging.info(f"Model and tokenizer initialized: {self.model_name}")
+                logger.info("Model and tokenizer initialized: %s", self.model_name)
             except Exception as e:
-                logging.error(f"Error initializing model and tokenizer: {e}")
+                logger.error("Error initializing model and tokenizer: %s", e)
                 self.tokenizer = None
                 self.model = None
         else:
             self.tokenizer = None
             self.model = None
 
-    def load_data(self, dataset=None, split="train"):
+    def load_data(self, dataset=None, split="train", streaming=None):
         """
         Load dataset for training.
         
         Args:
             dataset: Dataset to use (if already loaded)
             split (str): Dataset split to use
+            streaming (bool, optional): Stream the dataset; defaults to the trainer's setting
             
         Returns:
             object: Loaded dataset or None if unavailable
@@ -62,18 +215,21 @@ class TrainModel:
         if dataset is not None:
             return dataset
             
+        if streaming is None:
+            streaming = self.streaming
+            
         # Otherwise, import and load dataset
         if TRANSFORMERS_AVAILABLE:
             try:
                 from datasets import load_dataset
-                logging.info(f"Loading dataset: {self.dataset_name} ({split})")
-                dataset = load_dataset(self.dataset_name, split=split)
+                logger.info("Loading dataset: %s (%s, streaming=%s)", self.dataset_name, split, streaming)
+                dataset = load_dataset(self.dataset_name, split=split, streaming=streaming)
                 return dataset
             except Exception as e:
-                logging.error(f"Error loading dataset: {e}")
+                logger.error("Error loading dataset: %s", e)
                 return None
         else:
-            logging.error("Cannot load dataset: transformers/datasets not available")
+            logger.error("Cannot load dataset: transformers/datasets not available")
             return None
 
     def tokenize_function(self, examples):
@@ -87,21 +243,179 @@ class TrainModel:
             dict: Tokenized examples
         """
         if not self.tokenizer:
-            logging.error("Tokenizer not initialized")
+            logger.error("Tokenizer not initialized")
             return examples
             
         try:
-            return self.tokenizer(
-                examples["text"],
-                padding="max_length",
-                truncation=True,
-                max_length=512
-            )
+            return _tokenize_examples(examples, self.tokenizer)
         except Exception as e:
-            logging.error(f"Error tokenizing examples: {e}")
+            logger.error("Error tokenizing examples: %s", e)
             return examples
 
-    def train(self, dataset=None, epochs=3, batch_size=8, learning_rate=5e-5):
+    def pretokenize_to_bin(self, output_dir, dataset=None, num_proc=None, batch_size=1000,
+                           shard_tokens=PRETOKENIZE_SHARD_TOKENS):
+        """
+        Tokenize a dataset once and write it as a packed token file for training.
+        Shards are written as they fill, so an interrupted run resumes where it stopped.
+        
+        Args:
+            output_dir (str): Directory for shards and the consolidated tokens.bin
+            dataset: Dataset to tokenize (loaded with load_data if not provided)
+            num_proc (int, optional): Tokenization worker processes
+            batch_size (int): Texts per tokenization batch
+            shard_tokens (int): Tokens per shard file
+            
+        Returns:
+            str: Path to tokens.bin or None if failed
+        """
+        if not self.tokenizer:
+            logger.error("Tokenizer not initialized")
+            return None
+            
+        dataset = self.load_data(dataset)
+        if dataset is None:
+            return None
+            
+        os.makedirs(output_dir, exist_ok=True)
+        bin_path = os.path.join(output_dir, "tokens.bin")
+        progress_path = os.path.join(output_dir, "progress.json")
+        dtype = np.uint16 if len(self.tokenizer) <= np.iinfo(np.uint16).max + 1 else np.uint32
+        
+        try:
+            # Resume from the last completed shard
+            progress = {"shards": 0, "batches": 0}
+            if os.path.exists(progress_path):
+                with open(progress_path, "r") as f:
+                    progress = json.load(f)
+                logger.info("Resuming pretokenization after %s batches", progress["batches"])
+            
+            batches = (
+                (batch["text"], dtype.__name__)
+                for batch in itertools.islice(dataset.iter(batch_size=batch_size), progress["batches"], None)
+            )
+            
+            def write_shard(parts, batches_done):
+                shard_path = os.path.join(output_dir, f"shard_{progress['shards']:05d}.npy")
+                np.save(shard_path, np.concatenate(parts))
+                progress["shards"] += 1
+                progress["batches"] = batches_done
+                with open(progress_path, "w") as f:
+                    json.dump(progress, f)
+            
+            num_proc = num_proc or os.cpu_count()
+            logger.info("Pretokenizing dataset with %s processes", num_proc)
+            with multiprocessing.Pool(num_proc, initializer=_init_tokenize_worker, initargs=(self.tokenizer,)) as pool:
+                parts, buffered, batches_done = [], 0, progress["batches"]
+                for tokens in pool.imap(_tokenize_batch, batches):
+                    parts.append(tokens)
+                    buffered += len(tokens)
+                    batches_done += 1
+                    if buffered >= shard_tokens:
+                        write_shard(parts, batches_done)
+                        parts, buffered = [], 0
+                if parts:
+                    write_shard(parts, batches_done)
+            
+            # Consolidate shards into a single memory-mappable file
+            shard_paths = [os.path.join(output_dir, f"shard_{i:05d}.npy") for i in range(progress["shards"])]
+            shards = [np.load(path, mmap_mode="r") for path in shard_paths]
+            num_tokens = sum(len(shard) for shard in shards)
+            
+            tokens = np.memmap(bin_path, dtype=dtype, mode="w+", shape=(num_tokens,))
+            offset = 0
+            for shard in shards:
+                tokens[offset:offset + len(shard)] = shard
+                offset += len(shard)
+            tokens.flush()
+            del tokens
+            
+            with open(os.path.splitext(bin_path)[0] + ".json", "w") as f:
+                json.dump({"dtype": dtype.__name__, "num_tokens": num_tokens, "model_name": self.model_name}, f)
+            
+            logger.info("Pretokenized %s tokens to %s", num_tokens, bin_path)
+            return bin_path
+            
+        except Exception as e:
+            logger.error("Error pretokenizing dataset: %s", e)
+            return None
+
+    def _tokenized_cache_path(self, dataset):
+        """
+        Content-addressed directory for a tokenized and packed copy of a dataset.
+        
+        Args:
+            dataset: Dataset to be tokenized
+            
+        Returns:
+            str: Cache directory path
+        """
+        # Datasets fingerprint their contents and transforms; fall back to the dataset name
+        source = getattr(dataset, "_fingerprint", None) or self.dataset_name
+        cache_key = hashlib.sha256(f"{self.model_name}:{source}:{BLOCK_SIZE}".encode()).hexdigest()[:16]
+        return os.path.join(Config.get("data_dir", "data"), "tokenized", f"tok_{cache_key}")
+
+    def _cache_checksum(self, cache_path):
+        """
+        SHA-256 over the first and last Arrow shards of a saved dataset.
+        
+        Args:
+            cache_path (str): Directory written by save_to_disk
+            
+        Returns:
+            str: Hex digest
+        """
+        shards = sorted(glob.glob(os.path.join(cache_path, "*.arrow")))
+        digest = hashlib.sha256()
+        for shard_path in dict.fromkeys(shards[:1] + shards[-1:]):
+            with open(shard_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 22), b""):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def _load_tokenized_cache(self, cache_path):
+        """
+        Load a cached tokenized dataset if it exists and its checksum matches.
+        
+        Args:
+            cache_path (str): Cache directory path
+            
+        Returns:
+            object: Cached dataset or None
+        """
+        checksum_path = os.path.join(cache_path, "checksum.json")
+        if not os.path.exists(checksum_path):
+            return None
+            
+        try:
+            with open(checksum_path, "r") as f:
+                expected = json.load(f)["sha256"]
+            if self._cache_checksum(cache_path) != expected:
+                logger.warning("Tokenized dataset cache is corrupt, rebuilding: %s", cache_path)
+                return None
+            logger.info("Loading tokenized dataset from cache: %s", cache_path)
+            return load_from_disk(cache_path)
+        except Exception as e:
+            logger.warning("Could not load tokenized dataset cache: %s", e)
+            return None
+
+    def _save_tokenized_cache(self, dataset, cache_path):
+        """
+        Save a tokenized dataset with a checksum for later runs.
+        
+        Args:
+            dataset: Tokenized dataset
+            cache_path (str): Cache directory path
+        """
+        try:
+            dataset.save_to_disk(cache_path)
+            with open(os.path.join(cache_path, "checksum.json"), "w") as f:
+                json.dump({"sha256": self._cache_checksum(cache_path)}, f)
+            logger.info("Tokenized dataset cached to %s", cache_path)
+        except Exception as e:
+            logger.warning("Could not cache tokenized dataset: %s", e)
+
+    def train(self, dataset=None, epochs=3, batch_size=8, learning_rate=5e-5, max_steps=None,
+              pretokenized_path=None, gradient_checkpointing=False):
         """
         Train the language model.
         
@@ -110,45 +424,129 @@ class TrainModel:
             epochs (int): Number of training epochs
             batch_size (int): Batch size for training
             learning_rate (float): Learning rate
+            max_steps (int, optional): Number of optimizer steps; required for
+                streaming datasets whose length is unknown
+            pretokenized_path (str, optional): tokens.bin from pretokenize_to_bin;
+                trains from the memory-mapped tokens instead of tokenizing on the fly
+            gradient_checkpointing (bool): Recompute activations in the backward pass
+                to fit larger models or batches in GPU memory
             
         Returns:
             bool: Success status
         """
         if not TRANSFORMERS_AVAILABLE:
-            logging.error("Cannot train model: transformers not available")
+            logger.error("Cannot train model: transformers not available")
             return False
             
         if not self.model or not self.tokenizer:
-            logging.error("Model or tokenizer not initialized")
+            logger.error("Model or tokenizer not initialized")
             return False
             
         # Load dataset if not provided
-        if dataset is None:
+        if dataset is None and pretokenized_path is None:
             dataset = self.load_data()
             if dataset is None:
                 return False
                 
+        is_streaming = DATASETS_AVAILABLE and isinstance(dataset, IterableDataset)
+        if is_streaming and max_steps is None:
+            logger.error("max_steps is required when training on a streaming dataset")
+            return False
+                
         try:
-            # Tokenize dataset
-            logging.info("Tokenizing dataset")
-            tokenized_dataset = dataset.map(
-                self.tokenize_function,
-                batched=True,
-                remove_columns=["text"]
-            )
+            if pretokenized_path:
+                # Train straight from the memory-mapped token file
+                logger.info("Using pretokenized dataset: %s", pretokenized_path)
+                tokenized_dataset = PackedTokenDataset(pretokenized_path)
+            else:
+                if is_streaming:
+                    # Shuffle within a bounded buffer; the full dataset is never in memory
+                    dataset = dataset.shuffle(buffer_size=10_000, seed=42)
+                    
+                # Reuse the tokenized dataset from an earlier run when possible
+                cache_path = None if is_streaming else self._tokenized_cache_path(dataset)
+                tokenized_dataset = self._load_tokenized_cache(cache_path) if cache_path else None
+                
+                if tokenized_dataset is None:
+                    # Streaming datasets may not know their columns up front
+                    columns = dataset.column_names or ["text"]
+                    
+                    # Tokenize dataset in large batches; streaming datasets map lazily in-process
+                    logger.info("Tokenizing dataset")
+                    map_kwargs = {} if is_streaming else {"num_proc": os.cpu_count()}
+                    tokenized_dataset = dataset.map(
+                        _tokenize_examples,
+                        batched=True,
+                        batch_size=1000,
+                        remove_columns=columns,
+                        fn_kwargs={"tokenizer": self.tokenizer},
+                        **map_kwargs
+                    )
+                    
+                    # Pack tokens into fixed-length blocks instead of padding each row
+                    logger.info("Packing dataset into %s-token blocks", BLOCK_SIZE)
+                    # Fixed-length int32 columns let Arrow hand out tensors without per-row copies
+                    tokenized_dataset = tokenized_dataset.map(
+                        _group_texts,
+                        batched=True,
+                        batch_size=1000,
+                        features=Features({"input_ids": Sequence(Value("int32"), length=BLOCK_SIZE)}),
+                        **map_kwargs
+                    )
+                    
+                    if cache_path:
+                        self._save_tokenized_cache(tokenized_dataset, cache_path)
+                
+                # Produce torch tensors straight from Arrow instead of Python lists;
+                # IterableDataset.with_format takes no columns argument
+                if is_streaming:
+                    tokenized_dataset = tokenized_dataset.select_columns(["input_ids"]).with_format("torch")
+                else:
+                    tokenized_dataset = tokenized_dataset.with_format("torch", columns=["input_ids"])
+            
+            # Load batches in background workers and copy them from pinned memory
+            num_workers = Config.get("training_num_workers")
+            if num_workers is None:
+                num_workers = min(8, (os.cpu_count() or 1) // 2)
+            loader_kwargs = {}
+            if num_workers > 0:
+                loader_kwargs = {"dataloader_persistent_workers": True, "dataloader_prefetch_factor": 2}
+            
+            # Mixed precision, TF32 matmuls, fused AdamW and compilation need a CUDA device
+            precision_kwargs = {}
+            if torch.cuda.is_available():
+                is_bf16 = torch.cuda.is_bf16_supported()
+                precision_kwargs = {
+                    "bf16": is_bf16,
+                    "fp16": not is_bf16,
+                    "tf32": torch.cuda.get_device_capability()[0] >= 8,
+                    "optim": "adamw_torch_fused",
+                    # Every batch is (batch_size, BLOCK_SIZE), so CUDA graphs are captured once
+                    "torch_compile": True,
+                    "torch_compile_mode": "reduce-overhead",
+                    "dataloader_drop_last": True,
+                }
+                logger.info("Mixed precision training: %s", "bf16" if is_bf16 else "fp16")
             
             # Set up training arguments
             training_args = TrainingArguments(
                 output_dir=self.save_path,
-                evaluation_strategy="epoch",
+                # No eval_dataset is passed, so per-epoch evaluation would fail
+                eval_strategy="no",
                 per_device_train_batch_size=batch_size,
                 per_device_eval_batch_size=batch_size,
                 num_train_epochs=epochs,
+                max_steps=max_steps if max_steps is not None else -1,
                 learning_rate=learning_rate,
                 weight_decay=0.01,
                 save_steps=500,
                 save_total_limit=2,
                 logging_dir=os.path.join(self.save_path, "logs"),
+                dataloader_num_workers=num_workers,
+                dataloader_pin_memory=torch.cuda.is_available(),
+                gradient_checkpointing=gradient_checkpointing,
+                **loader_kwargs,
+                **precision_kwargs
             )
             
             # Initialize trainer
@@ -156,10 +554,14 @@ class TrainModel:
                 model=self.model,
                 args=training_args,
                 train_dataset=tokenized_dataset,
+                data_collator=_collate_blocks,
             )
             
             # Start training
-            logging.info(f"Starting model training for {epochs} epochs")
+            if max_steps is not None:
+                logger.info("Starting model training for %s steps", max_steps)
+            else:
+                logger.info("Starting model training for %s epochs", epochs)
             trainer.train()
             
             # Save model
@@ -168,7 +570,7 @@ class TrainModel:
             return True
             
         except Exception as e:
-            logging.error(f"Error during training: {e}")
+            logger.error("Error during training: %s", e)
             return False
 
     def save_model(self):
@@ -179,11 +581,11 @@ class TrainModel:
             bool: Success status
         """
         if not self.model or not self.tokenizer:
-            logging.error("Model or tokenizer not initialized")
+            logger.error("Model or tokenizer not initialized")
             return False
             
         try:
-            logging.info(f"Saving model to {self.save_path}")
+            logger.info("Saving model to %s", self.save_path)
             
             # Save model and tokenizer
             self.model.save_pretrained(self.save_path)
@@ -191,7 +593,7 @@ class TrainModel:
             
             return True
         except Exception as e:
-            logging.error(f"Error saving model: {e}")
+            logger.error("Error saving model: %s", e)
             return False
 
     def generate_text(self, prompt, max_length=100):
@@ -209,22 +611,27 @@ class TrainModel:
             return "Model or tokenizer not initialized"
             
         try:
-            # Tokenize input
+            # Tokenize input and move it to the model's device
             inputs = self.tokenizer(prompt, return_tensors="pt")
+            inputs = {k: v.to(self.model.device, non_blocking=True) for k, v in inputs.items()}
             
             # Generate text
-            with torch.no_grad():
+            with torch.inference_mode():
                 outputs = self.model.generate(
-                    inputs["input_ids"],
+                    **inputs,
                     max_length=max_length,
                     num_return_sequences=1,
+                    do_sample=True,
                     temperature=0.7,
-                    top_p=0.9
+                    top_k=50,
+                    top_p=0.9,
+                    use_cache=True,
+                    pad_token_id=self.tokenizer.pad_token_id
                 )
                 
             # Decode and return generated text
             return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
             
         except Exception as e:
-            logging.error(f"Error generating text: {e}")
+            logger.error("Error generating text: %s", e)
             return f"Error generating text: {str(e)}"
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 import yaml
 import logging
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,8 +13,8 @@ class Config:
     Loads from config.yaml and .env files.
     """
     
-    # Default configuration
-    _config = {
+    # Default configuration; read-only, replaced wholesale by load() and set()
+    _config = MappingProxyType({
         # General Settings
         "project_name": "AI Assistant",
         "version": "1.0.0",
@@ -29,6 +30,10 @@ class Config:
         "default_model_type": "gpt4all",
         "default_model_path": "models/gpt4all-j-v1.3-groovy.bin",
         "fallback_model_type": "gpt4all",
+        "semantic_cache_threshold": 0.95,
+        
+        # Training Settings
+        "training_num_workers": None,  # DataLoader workers; None picks min(8, cpu_count // 2)
         
         # API Keys (will be overridden by environment variables if present)
         "openai_api_key": "",
@@ -46,7 +51,10 @@ class Config:
         # GUI Settings
         "gui_theme": "light",
         "gui_font_size": 12
-    }
+    })
+    
+    # Directories already created by init_directories in this process
+    _dirs_created = set()
     
     @classmethod
     def load(cls, config_file="config.yaml"):
@@ -55,25 +63,34 @@ class Config:
         """
         config_path = os.path.join(cls._config["base_dir"], config_file)
         
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r') as file:
-                    loaded_config = yaml.safe_load(file)
-                    if loaded_config:
-                        cls._config.update(loaded_config)
-                logging.info(f"Configuration loaded from {config_path}")
-            except Exception as e:
-                logging.error(f"Error loading configuration: {e}")
-        else:
-            logging.warning(f"Configuration file not found: {config_path}")
+        # Build the new configuration privately; readers keep the old one until it is published
+        config = dict(cls._config)
+        
+        try:
+            if os.path.exists(config_path):
+                try:
+                    with open(config_path, 'r') as file:
+                        loaded_config = yaml.safe_load(file)
+                        if loaded_config:
+                            config.update(loaded_config)
+                    logging.info(f"Configuration loaded from {config_path}")
+                except Exception as e:
+                    logging.error(f"Error loading configuration: {e}")
+            else:
+                logging.warning(f"Configuration file not found: {config_path}")
+                
+            # Override with environment variables (env vars take precedence)
+            config = cls._load_from_env(config)
             
-        # Override with environment variables (env vars take precedence)
-        cls._load_from_env()
+            # Ensure absolute paths for directories
+            for dir_key in ["data_dir", "logs_dir", "models_dir"]:
+                if not os.path.isabs(config[dir_key]):
+                    config[dir_key] = os.path.join(config["base_dir"], config[dir_key])
+        except Exception as e:
+            logging.error(f"Invalid configuration, keeping the previous one: {e}")
+            return cls
         
-        # Ensure absolute paths for directories
-        for dir_key in ["data_dir", "logs_dir", "models_dir"]:
-            if not os.path.isabs(cls._config[dir_key]):
-                cls._config[dir_key] = os.path.join(cls._config["base_dir"], cls._config[dir_key])
+        cls._config = MappingProxyType(config)
         
         # Initialize directories
         cls.init_directories()
@@ -81,9 +98,15 @@ class Config:
         return cls
     
     @classmethod
-    def _load_from_env(cls):
+    def _load_from_env(cls, config):
         """
         Load configuration from environment variables.
+        
+        Args:
+            config (dict): Configuration to override
+            
+        Returns:
+            dict: The same configuration with environment overrides applied
         """
         # Map environment variables to config keys
         env_mapping = {
@@ -101,9 +124,11 @@ class Config:
             if env_var in os.environ:
                 # Convert string boolean values to actual booleans
                 if os.environ[env_var].lower() in ["true", "false"]:
-                    cls._config[config_key] = os.environ[env_var].lower() == "true"
+                    config[config_key] = os.environ[env_var].lower() == "true"
                 else:
-                    cls._config[config_key] = os.environ[env_var]
+                    config[config_key] = os.environ[env_var]
+        
+        return config
     
     @classmethod
     def get(cls, key, default=None):
@@ -117,14 +142,17 @@ class Config:
         """
         Set a configuration value.
         """
-        cls._config[key] = value
+        config = dict(cls._config)
+        config[key] = value
+        cls._config = MappingProxyType(config)
     
     @classmethod
     def init_directories(cls):
         """
         Creates necessary directories if they do not exist.
         """
-        for directory in [cls._config["data_dir"], cls._config["logs_dir"], cls._config["models_dir"]]:
-            if not os.path.exists(directory):
-                os.makedirs(directory)
-                logging.info(f"Created directory: {directory}")
\ No newline at end of file
+        for directory in (cls._config["data_dir"], cls._config["logs_dir"], cls._config["models_dir"]):
+            if directory in cls._dirs_created:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            cls._dirs_created.add(directory)
\ No newline at end of file
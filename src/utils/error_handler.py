@@ -1,5 +1,6 @@
 import sys
 import logging
+import functools
 import traceback
 
 class ErrorHandler:
@@ -37,9 +38,51 @@ class ErrorHandler:
         try:
             return func()
         except Exception as e:
-            logging.error(f"{error_message}: {str(e)}")
+            logging.error("%s: %s", error_message, e, exc_info=True)
             return default_return
     
+    @staticmethod
+    def safe(message="An error occurred", default=None):
+        """
+        Decorator form of try_except for functions called repeatedly.
+        
+        :param message: Message to log on error
+        :param default: Value to return on error
+        :return: Decorator that wraps a function with error logging
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    logging.error("%s: %s", message, e, exc_info=True)
+                    return default
+            return wrapper
+        return decorator
+    
+    @staticmethod
+    def safe_batch(iterable, func, message="An error occurred", default=None):
+        """
+        Apply a function to each element, yielding default for elements that fail.
+        
+        :param iterable: Elements to process
+        :param func: Function to apply to each element
+        :param message: Message to log on error
+        :param default: Value yielded for a failed element
+        :return: Generator of results
+        """
+        iterator = iter(iterable)
+        while True:
+            # One handler covers the whole run of successful elements
+            try:
+                for item in iterator:
+                    yield func(item)
+                return
+            except Exception as e:
+                logging.error("%s: %s", message, e, exc_info=True)
+                yield default
+    
     @staticmethod
     def validate_input(input_data, input_type=None):
         """
@@ -1,16 +1,84 @@
 import os
 import logging
 import mimetypes
-import magic
 import tempfile
-import PyPDF2
-import docx
-import pandas as pd
 import csv
 import json
+import functools
+import importlib
+import itertools
+from collections import deque
 import xml.etree.ElementTree as ET
 from src.security.ai_security import AISecurity
 
+# Heavy parsing libraries are imported on first use so that importing this
+# module (or processing only text files) does not pay for them.
+
+@functools.lru_cache(maxsize=None)
+def _import_pandas():
+    """Import pandas once, on first use."""
+    import pandas as pd
+    return pd
+
+@functools.lru_cache(maxsize=None)
+def _optional_import(module_name):
+    """
+    Import an optional module once, on first use.
+    
+    Returns:
+        module: The module, or None if it is not installed
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+# MIME types accepted for each file category
+_CATEGORY_MIMES = {
+    'document': frozenset({
+        'application/pdf',
+        'application/msword',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'application/rtf',
+        'application/vnd.oasis.opendocument.text'
+    }),
+    'data': frozenset({
+        'text/csv',
+        'application/json',
+        'application/xml',
+        'text/plain'
+    }),
+    'spreadsheet': frozenset({
+        'application/vnd.ms-excel',
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    }),
+    'code': frozenset({
+        'text/plain',
+        'text/x-python',
+        'text/javascript',
+        'text/html',
+        'text/css',
+        'text/x-java',
+        'text/x-c',
+        'application/x-httpd-php'
+    })
+}
+
+# Categories that accept any MIME type under a prefix
+_CATEGORY_PREFIXES = {
+    'text': 'text/',
+    'image': 'image/',
+    'audio': 'audio/',
+    'video': 'video/'
+}
+
+# Bytes read for MIME detection, matching libmagic's default scan limit
+MIME_SAMPLE_SIZE = 1024 * 1024
+
+# Small plain-text files with these extensions skip libmagic detection
+_SAFE_TEXT_EXTENSIONS = frozenset({'.txt', '.py', '.js', '.css', '.html', '.json', '.csv'})
+_SAFE_TEXT_MAX_SIZE = 1024 * 1024
+
 class FileProcessor:
     """
     Utility for processing different types of files.
@@ -22,6 +90,10 @@ class FileProcessor:
         self.security = AISecurity()
         self.max_file_size = 10 * 1024 * 1024  # 10MB
         
+        # Loading the magic database is expensive; reuse one detector
+        import magic
+        self._mime = magic.Magic(mime=True)
+        
         # Allowed file extensions and MIME types
         self.allowed_extensions = {
             # Documents
@@ -83,13 +155,29 @@ class FileProcessor:
         Returns:
             tuple: (is_valid, file_info or error_message)
         """
-        # Check if file exists
-        if not os.path.exists(file_path):
-            return False, "File not found"
+        is_valid, result, _ = self._validate(file_path)
+        return is_valid, result
+    
+    def _validate(self, file_path):
+        """
+        Validate a file, also returning the leading bytes read for MIME detection
+        so processors can reuse them instead of reopening the file.
+        
+        Args:
+            file_path (str): Path to the file
+            
+        Returns:
+            tuple: (is_valid, file_info or error_message, sample bytes or None)
+        """
+        # Check if file exists; one stat call also gives the size
+        try:
+            file_size = os.stat(file_path).st_size
+        except OSError:
+            return False, "File not found", None
         
         # Check file size
-        if os.path.getsize(file_path) > self.max_file_size:
-            return False, f"File too large. Maximum size: {self.max_file_size // (1024 * 1024)}MB"
+        if file_size > self.max_file_size:
+            return False, f"File too large. Maximum size: {self.max_file_size // (1024 * 1024)}MB", None
         
         # Get file extension
         _, ext = os.path.splitext(file_path)
@@ -97,35 +185,42 @@ class FileProcessor:
         
         # Check if extension is allowed
         if ext not in self.allowed_extensions:
-            return False, f"File type not supported: {ext}"
+            return False, f"File type not supported: {ext}", None
         
         # Check MIME type for additional security
         try:
-            mime = magic.Magic(mime=True)
-            mime_type = mime.from_file(file_path)
-            
-            # Verify MIME type matches extension
-            expected_mime_category = self.allowed_extensions[ext]
-            
-            if not self._is_mime_type_valid(mime_type, expected_mime_category):
-                logging.warning(f"MIME type mismatch: {mime_type} for file with extension {ext}")
-                return False, "File appears to be disguised with incorrect extension"
+            if ext in _SAFE_TEXT_EXTENSIONS and file_size < _SAFE_TEXT_MAX_SIZE:
+                # Small text files are only ever read as text; take the type from the extension
+                sample = None
+                mime_type = mimetypes.guess_type(file_path)[0] or 'text/plain'
+            else:
+                with open(file_path, 'rb') as f:
+                    sample = f.read(MIME_SAMPLE_SIZE)
+                
+                mime_type = self._mime.from_buffer(sample)
+                
+                # Verify MIME type matches extension
+                expected_mime_category = self.allowed_extensions[ext]
+                
+                if not self._is_mime_type_valid(mime_type, expected_mime_category):
+                    logging.warning(f"MIME type mismatch: {mime_type} for file with extension {ext}")
+                    return False, "File appears to be disguised with incorrect extension", None
             
             # Create file info
             file_info = {
                 "path": file_path,
                 "name": os.path.basename(file_path),
-                "size": os.path.getsize(file_path),
+                "size": file_size,
                 "mime_type": mime_type,
                 "extension": ext,
                 "category": self.allowed_extensions[ext]
             }
             
-            return True, file_info
+            return True, file_info, sample
             
         except Exception as e:
             logging.error(f"Error validating file {file_path}: {e}")
-            return False, f"Error validating file: {str(e)}"
+            return False, f"Error validating file: {str(e)}", None
     
     def process_file(self, file_path):
         """
@@ -138,7 +233,7 @@ class FileProcessor:
             dict: Processed file information and content
         """
         # Validate the file first
-        is_valid, result = self.validate_file(file_path)
+        is_valid, result, sample = self._validate(file_path)
         
         if not is_valid:
             return {"error": result}
@@ -152,7 +247,7 @@ class FileProcessor:
             elif file_info["category"] == "document":
                 content = self._process_document(file_path, file_info["extension"])
             elif file_info["category"] == "data":
-                content = self._process_data_file(file_path, file_info["extension"])
+                content = self._process_data_file(file_path, file_info["extension"], sample)
             elif file_info["category"] == "spreadsheet":
                 content = self._process_spreadsheet(file_path)
             elif file_info["category"] == "image":
@@ -218,16 +313,45 @@ class FileProcessor:
     
     def _process_pdf(self, file_path):
         """Process a PDF file."""
+        # Prefer PyMuPDF for PDF text extraction; PyPDF2 is a slower pure-Python fallback
+        fitz = _optional_import('fitz')
+        if fitz is None:
+            return self._process_pdf_pypdf2(file_path)
+            
+        try:
+            with fitz.open(file_path) as doc:
+                num_pages = doc.page_count
+                processed_pages = min(num_pages, 50)  # Limit to 50 pages
+                
+                # Extract text from each page
+                parts = [doc.load_page(i).get_text("text") for i in range(processed_pages)]
+                
+            text = "\n\n".join(parts)
+            
+            # Truncate if too large
+            if len(text) > 100000:
+                text = text[:100000] + "\n[Content truncated due to size]"
+            
+            return {
+                "text": text,
+                "num_pages": num_pages,
+                "processed_pages": processed_pages
+            }
+        except Exception as e:
+            raise Exception(f"Error processing PDF file: {str(e)}")
+    
+    def _process_pdf_pypdf2(self, file_path):
+        """Process a PDF file with PyPDF2."""
+        import PyPDF2
+        
         try:
-            text = ""
             with open(file_path, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
                 num_pages = len(reader.pages)
                 
-                # Extract text from each page
-                for i in range(min(num_pages, 50)):  # Limit to 50 pages
-                    page = reader.pages[i]
-                    text += page.extract_text() + "\n\n"
+                # Extract text from each page and join once
+                parts = [reader.pages[i].extract_text() or "" for i in range(min(num_pages, 50))]  # Limit to 50 pages
+                text = "\n\n".join(parts)
                 
                 # Truncate if too large
                 if len(text) > 100000:
@@ -243,25 +367,38 @@ class FileProcessor:
     
     def _process_docx(self, file_path):
         """Process a DOCX file."""
+        import docx
+        
         try:
             doc = docx.Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            paragraphs = doc.paragraphs  # Built anew on each access
             
-            # Truncate if too large
-            if len(text) > 100000:
+            # Stop reading paragraph text once the size limit is passed
+            parts, total, skipped = [], 0, False
+            for index, paragraph in enumerate(paragraphs):
+                paragraph_text = paragraph.text
+                parts.append(paragraph_text)
+                total += len(paragraph_text) + 1
+                if total > 100000:
+                    skipped = index + 1 < len(paragraphs)
+                    break
+            text = "\n".join(parts)
+            
+            # Truncate if too large, including when unread paragraphs were skipped
+            if skipped or len(text) > 100000:
                 text = text[:100000] + "\n[Content truncated due to size]"
             
             return {
                 "text": text,
-                "paragraphs": len(doc.paragraphs)
+                "paragraphs": len(paragraphs)
             }
         except Exception as e:
             raise Exception(f"Error processing DOCX file: {str(e)}")
     
-    def _process_data_file(self, file_path, extension):
+    def _process_data_file(self, file_path, extension, sample=None):
         """Process a data file (CSV, JSON, XML)."""
         if extension == '.csv':
-            return self._process_csv(file_path)
+            return self._process_csv(file_path, sample)
         elif extension == '.json':
             return self._process_json(file_path)
         elif extension == '.xml':
@@ -269,35 +406,48 @@ class FileProcessor:
         else:
             return {"error": f"Unsupported data file extension: {extension}"}
     
-    def _process_csv(self, file_path):
-        """Process a CSV file."""
+    def _process_csv(self, file_path, sample=None):
+        """Process a CSV file, sniffing the format from sample if given."""
         try:
             # First check encoding and delimiter
             encoding = 'utf-8'
             delimiter = ','
             
             # Try to detect encoding and delimiter
-            with open(file_path, 'rb') as f:
-                sample = f.read(4096)
-                
-                # Try to determine encoding
-                if sample.startswith(b'\xef\xbb\xbf'):
-                    encoding = 'utf-8-sig'
-                
-                # Check for common delimiters
-                text_sample = sample.decode(encoding, errors='replace')
-                if text_sample.count(';') > text_sample.count(','):
-                    delimiter = ';'
-                elif text_sample.count('\t') > text_sample.count(','):
-                    delimiter = '\t'
+            if sample is None:
+                with open(file_path, 'rb') as f:
+                    sample = f.read(4096)
+            else:
+                sample = sample[:4096]
+            
+            # Try to determine encoding
+            if sample.startswith(b'\xef\xbb\xbf'):
+                encoding = 'utf-8-sig'
+            
+            # Check for common delimiters; ASCII bytes never occur inside UTF-8 sequences
+            commas = sample.count(b',')
+            if sample.count(b';') > commas:
+                delimiter = ';'
+            elif sample.count(b'\t') > commas:
+                delimiter = '\t'
             
-            # Read the CSV
-            df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter, error_bad_lines=False)
+            # Use pyarrow's streaming CSV reader when available
+            pa_csv = _optional_import('pyarrow.csv')
+            if pa_csv is not None:
+                try:
+                    return self._process_csv_arrow(pa_csv, file_path, encoding, delimiter)
+                except Exception as e:
+                    # Types inferred from the first block may not fit later blocks
+                    logging.debug(f"pyarrow could not parse {file_path}, using pandas: {e}")
+            
+            # Parse only the preview rows; the row count comes from a byte scan
+            pd = _import_pandas()
+            df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter, on_bad_lines='skip', nrows=5)
             
             # Get basic stats
             result = {
                 "columns": list(df.columns),
-                "rows": len(df),
+                "rows": self._count_csv_rows(file_path),
                 "column_types": {col: str(df[col].dtype) for col in df.columns},
                 "preview": df.head(5).to_dict(orient='records'),
                 "delimiter": delimiter,
@@ -308,33 +458,93 @@ class FileProcessor:
         except Exception as e:
             raise Exception(f"Error processing CSV file: {str(e)}")
     
+    def _count_csv_rows(self, file_path):
+        """Count data rows in a CSV file by counting line breaks, excluding the header."""
+        lines = 0
+        last_byte = b'\n'
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                lines += block.count(b'\n')
+                last_byte = block[-1:]
+        
+        # A final line without a trailing newline still counts
+        if last_byte != b'\n':
+            lines += 1
+        return max(lines - 1, 0)
+    
+    def _process_csv_arrow(self, pa_csv, file_path, encoding, delimiter):
+        """
+        Summarize a CSV file with pyarrow's streaming reader.
+        The preview and column types come from the first block; the remaining
+        blocks are only counted.
+        """
+        reader = pa_csv.open_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(block_size=1 << 20),
+            parse_options=pa_csv.ParseOptions(delimiter=delimiter, invalid_row_handler=lambda row: 'skip')
+        )
+        schema = reader.schema
+        
+        try:
+            first_batch = reader.read_next_batch()
+        except StopIteration:
+            first_batch = None
+        
+        preview = first_batch.slice(0, 5).to_pylist() if first_batch is not None else []
+        rows = sum(batch.num_rows for batch in reader) + (first_batch.num_rows if first_batch is not None else 0)
+        
+        return {
+            "columns": schema.names,
+            "rows": rows,
+            "column_types": {field.name: str(field.type) for field in schema},
+            "preview": preview,
+            "delimiter": delimiter,
+            "encoding": encoding
+        }
+    
     def _process_json(self, file_path):
         """Process a JSON file."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-                data = json.load(file)
-                
-                # Convert to string representation for simple preview
-                json_str = json.dumps(data, indent=2)
-                preview = json_str[:1000] + "..." if len(json_str) > 1000 else json_str
-                
-                return {
-                    "structure": self._get_json_structure(data),
-                    "preview": preview
-                }
+            with open(file_path, 'rb') as file:
+                raw = file.read()
+            
+            # orjson parses JSON much faster than the standard library when available
+            orjson = _optional_import('orjson')
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            
+            # Preview the start of the file as written instead of re-serializing it
+            head = raw[:4096].decode('utf-8', errors='replace')
+            preview = head[:1000] + "..." if len(head) > 1000 else head
+            
+            return {
+                "structure": self._get_json_structure(data),
+                "preview": preview
+            }
         except Exception as e:
             raise Exception(f"Error processing JSON file: {str(e)}")
     
     def _process_xml(self, file_path):
         """Process an XML file."""
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+            # Stream the document instead of building the whole tree
+            root, attributes, children, depth = None, None, 0, 0
+            for event, element in ET.iterparse(file_path, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        root, attributes = element, dict(element.attrib)
+                    elif depth == 2:
+                        children += 1
+                else:
+                    depth -= 1
+                    if depth == 1:
+                        # Drop each finished top-level subtree
+                        root.clear()
             
             structure = {
                 "root_tag": root.tag,
-                "attributes": root.attrib,
-                "children": self._count_xml_children(root)
+                "attributes": attributes,
+                "children": children
             }
             
             return structure
@@ -344,26 +554,39 @@ class FileProcessor:
     def _process_spreadsheet(self, file_path):
         """Process a spreadsheet file (XLSX, XLS)."""
         try:
-            # Read all sheets
-            excel_data = pd.read_excel(file_path, sheet_name=None)
-            
             result = {
                 "sheets": {}
             }
             
-            # Process each sheet
-            for sheet_name, df in excel_data.items():
-                sheet_data = {
-                    "columns": list(df.columns),
-                    "rows": len(df),
-                    "preview": df.head(5).to_dict(orient='records')
-                }
-                result["sheets"][sheet_name] = sheet_data
+            # Open the workbook once and parse only the preview rows of each sheet
+            pd = _import_pandas()
+            with pd.ExcelFile(file_path) as excel_file:
+                for sheet_name in excel_file.sheet_names:
+                    df = excel_file.parse(sheet_name, nrows=5)
+                    sheet_data = {
+                        "columns": list(df.columns),
+                        "rows": self._count_sheet_rows(excel_file.book, sheet_name),
+                        "preview": df.to_dict(orient='records')
+                    }
+                    result["sheets"][sheet_name] = sheet_data
             
             return result
         except Exception as e:
             raise Exception(f"Error processing spreadsheet file: {str(e)}")
     
+    def _count_sheet_rows(self, book, sheet_name):
+        """Count data rows in a sheet from workbook metadata, excluding the header."""
+        if hasattr(book, 'sheet_by_name'):
+            # xlrd workbook (.xls)
+            total = book.sheet_by_name(sheet_name).nrows
+        else:
+            # openpyxl workbook (.xlsx); max_row is unset when the file has no dimensions
+            sheet = book[sheet_name]
+            total = sheet.max_row
+            if total is None:
+                total = sum(1 for _ in sheet.iter_rows(values_only=True))
+        return max(total - 1, 0)
+    
     def _process_code_file(self, file_path):
         """Process a code file."""
         try:
@@ -389,46 +612,10 @@ class FileProcessor:
         Returns:
             bool: True if valid, False otherwise
         """
-        if expected_category == 'text':
-            return mime_type.startswith('text/')
-        elif expected_category == 'document':
-            return mime_type in [
-                'application/pdf',
-                'application/msword',
-                'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                'application/rtf',
-                'application/vnd.oasis.opendocument.text'
-            ]
-        elif expected_category == 'data':
-            return mime_type in [
-                'text/csv',
-                'application/json',
-                'application/xml',
-                'text/plain'
-            ]
-        elif expected_category == 'spreadsheet':
-            return mime_type in [
-                'application/vnd.ms-excel',
-                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            ]
-        elif expected_category == 'image':
-            return mime_type.startswith('image/')
-        elif expected_category == 'audio':
-            return mime_type.startswith('audio/')
-        elif expected_category == 'video':
-            return mime_type.startswith('video/')
-        elif expected_category == 'code':
-            return mime_type in [
-                'text/plain',
-                'text/x-python',
-                'text/javascript',
-                'text/html',
-                'text/css',
-                'text/x-java',
-                'text/x-c',
-                'application/x-httpd-php'
-            ]
-        return False
+        if mime_type in _CATEGORY_MIMES.get(expected_category, ()):
+            return True
+        prefix = _CATEGORY_PREFIXES.get(expected_category)
+        return prefix is not None and mime_type.startswith(prefix)
     
     def _get_json_structure(self, data, max_depth=3, current_depth=0):
         """
@@ -436,40 +623,35 @@ class FileProcessor:
         
         Args:
             data: JSON data
-            max_depth (int): Maximum recursion depth
-            current_depth (int): Current recursion depth
+            max_depth (int): Maximum depth to describe
+            current_depth (int): Depth of data within the document
             
         Returns:
             dict: JSON structure information
         """
-        if current_depth >= max_depth:
-            return {"type": type(data).__name__, "truncated": True}
-            
-        if isinstance(data, dict):
-            return {
-                "type": "object",
-                "keys": len(data),
-                "properties": {k: self._get_json_structure(v, max_depth, current_depth + 1) 
-                              for k, v in list(data.items())[:10]}
-            }
-        elif isinstance(data, list):
-            return {
-                "type": "array",
-                "length": len(data),
-                "sample": [self._get_json_structure(v, max_depth, current_depth + 1) 
-                          for v in data[:5]]
-            }
-        else:
-            return {"type": type(data).__name__}
-    
-    def _count_xml_children(self, element):
-        """
-        Count children in an XML element.
+        structure = {}
         
-        Args:
-            element: XML element
+        # Breadth-first walk; each entry fills in the dict already placed in its parent
+        queue = deque([(data, current_depth, structure)])
+        while queue:
+            node, depth, out = queue.popleft()
             
-        Returns:
-            int: Number of child elements
-        """
-        return len(element.findall("./"))
\ No newline at end of file
+            if depth >= max_depth:
+                out.update(type=type(node).__name__, truncated=True)
+            elif isinstance(node, dict):
+                properties = {}
+                out.update(type="object", keys=len(node), properties=properties)
+                for key, value in itertools.islice(node.items(), 10):
+                    properties[key] = child = {}
+                    queue.append((value, depth + 1, child))
+            elif isinstance(node, list):
+                sample = []
+                out.update(type="array", length=len(node), sample=sample)
+                for value in node[:5]:
+                    child = {}
+                    sample.append(child)
+                    queue.append((value, depth + 1, child))
+            else:
+                out["type"] = type(node).__name__
+        
+        return structure
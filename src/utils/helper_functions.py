@@ -1,8 +1,16 @@
 import os
 import json
 import logging
+import threading
 from datetime import datetime
 
+# Check if orjson is available for faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 def setup_logging(log_file="logs/app.log"):
     """
     Sets up logging configuration.
@@ -24,16 +32,34 @@ def read_json(file_path):
         logging.error(f"File not found: {file_path}")
         return None
     
-    with open(file_path, "r") as file:
-        data = json.load(file)
-    return data
+    with open(file_path, "rb") as file:
+        raw = file.read()
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
 
 def write_json(file_path, data):
     """
-    Writes data to a JSON file.
+    Writes data to a JSON file atomically, so readers never see a partial file.
     """
-    with open(file_path, "w") as file:
-        json.dump(data, file, indent=4)
+    data_bytes = None
+    if ORJSON_AVAILABLE:
+        try:
+            data_bytes = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Types orjson does not serialize fall back to the standard library
+            pass
+    if data_bytes is None:
+        data_bytes = json.dumps(data, indent=2).encode("utf-8")
+    
+    # Write next to the target and rename over it; the name is unique per writer thread
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(data_bytes)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
     logging.info(f"Data written to {file_path}")
 
 def get_current_timestamp():
@@ -1,12 +1,25 @@
 # src/utils/model_manager.py
 
 import os
+import json
 import logging
 import requests
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from src.utils.config import Config
 
+# Read size for hashing large model files
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Parallel HTTP Range connections per download
+DOWNLOAD_CONNECTIONS = 4
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bytes downloaded per range between saves of the resume state
+DOWNLOAD_STATE_INTERVAL = 64 * 1024 * 1024
+
 class ModelManager:
     """
     Manages downloading and verification of AI models.
@@ -17,6 +30,9 @@ class ModelManager:
         self.models_dir = Config.get("models_dir", "models")
         os.makedirs(self.models_dir, exist_ok=True)
         
+        # model name -> (mtime_ns, size) of the file when its hash last matched
+        self._verified = {}
+        
         # Model information (name, url, expected file size, md5 hash)
         self.models = {
             "gpt4all": {
@@ -45,12 +61,13 @@ class ModelManager:
             }
         }
         
-    def check_model(self, model_name):
+    def check_model(self, model_name, file_hash=None):
         """
         Check if a model exists and is valid.
         
         Args:
             model_name (str): Name of the model to check
+            file_hash (str, optional): Already computed MD5 of the file; skips re-reading it
             
         Returns:
             bool: True if model exists and is valid, False otherwise
@@ -62,24 +79,30 @@ class ModelManager:
         model_info = self.models[model_name]
         model_path = os.path.join(self.models_dir, model_info["filename"])
         
-        # Check if file exists
-        if not os.path.exists(model_path):
+        # Check if file exists; one stat call also gives the size
+        try:
+            stat = os.stat(model_path)
+            file_size = stat.st_size
+        except OSError:
             logging.warning(f"Model file not found: {model_path}")
             return False
             
         # Check file size (optional quick check)
         if model_info["size"] > 0:  # Only check if we know the size
-            file_size = os.path.getsize(model_path)
             if file_size < model_info["size"] * 0.9 or file_size > model_info["size"] * 1.1:
                 logging.warning(f"Model file size mismatch for {model_name}: expected ~{model_info['size']}, got {file_size}")
                 return False
             
-        # Check MD5 hash (if provided)
-        if model_info["md5"]:
-            file_hash = self._get_file_hash(model_path)
+        # Check MD5 hash (if provided); skip it if the file is unchanged since it last matched
+        file_key = (stat.st_mtime_ns, file_size)
+        if model_info["md5"] and self._verified.get(model_name) != file_key:
+            if file_hash is None:
+                file_hash = self._get_file_hash(model_path)
             if file_hash != model_info["md5"]:
                 logging.warning(f"Model file hash mismatch for {model_name}: expected {model_info['md5']}, got {file_hash}")
+                self._verified.pop(model_name, None)
                 return False
+            self._verified[model_name] = file_key
             
         return True
     
@@ -93,9 +116,17 @@ class ModelManager:
         Returns:
             str: MD5 hash
         """
-        hash_md5 = hashlib.md5()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            # Ask the kernel for aggressive read-ahead on this one-pass read
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                
+            # file_digest reads into a reusable buffer without per-chunk Python objects
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "md5").hexdigest()
+                
+            hash_md5 = hashlib.md5()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
     
@@ -128,24 +159,29 @@ class ModelManager:
         logging.info(f"Downloading model {model_name} from {model_info['url']}")
         
         try:
-            # Stream download with progress bar
-            response = requests.get(model_info["url"], stream=True)
-            total_size = int(response.headers.get('content-length', 0))
+            # Download to a partial file so an interrupted download can resume
+            part_path = model_path + ".part"
+            head = requests.head(model_info["url"], allow_redirects=True)
+            total_size = int(head.headers.get('content-length', 0))
+            ranges_supported = head.headers.get('accept-ranges', '').lower() == 'bytes'
             
-            with open(model_path, 'wb') as f, tqdm(
+            with tqdm(
                 desc=model_info["filename"],
                 total=total_size,
                 unit='B',
                 unit_scale=True,
                 unit_divisor=1024,
             ) as progress_bar:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        progress_bar.update(len(chunk))
+                if ranges_supported and total_size > 0 and hasattr(os, "pwrite"):
+                    self._download_parallel(model_info["url"], part_path, total_size, progress_bar)
+                    file_hash = None
+                else:
+                    file_hash = self._download_stream(model_info["url"], part_path, progress_bar, total_size)
+            
+            os.replace(part_path, model_path)
             
-            # Verify download
-            if self.check_model(model_name):
+            # Verify download; a sequential download was hashed as it was written
+            if self.check_model(model_name, file_hash=file_hash):
                 logging.info(f"Model {model_name} downloaded successfully.")
                 return True
             else:
@@ -156,6 +192,140 @@ class ModelManager:
             logging.error(f"Error downloading model {model_name}: {e}")
             return False
     
+    def _download_stream(self, url, part_path, progress_bar, total_size=0):
+        """
+        Download a file over a single connection, resuming a partial file if possible.
+        The MD5 is computed as the data is written.
+        
+        Args:
+            url (str): File URL
+            part_path (str): Partial download path
+            progress_bar: tqdm progress bar
+            total_size (int): File size from Content-Length, 0 if unknown
+            
+        Returns:
+            str: MD5 hash of the downloaded file
+        """
+        # A parallel attempt preallocates the full file, so its size is not a resume
+        # offset; start over rather than request a range past the end
+        state_path = part_path + ".json"
+        if os.path.exists(state_path) or (
+            total_size and os.path.exists(part_path) and os.path.getsize(part_path) >= total_size
+        ):
+            logging.info(f"Discarding partial download that cannot be resumed: {part_path}")
+            for path in (part_path, state_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        
+        with requests.get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            
+            # Servers that ignore the Range header send the whole file again
+            if response.status_code != 206:
+                offset = 0
+            progress_bar.update(offset)
+            
+            # Hash the bytes kept from the earlier attempt before appending
+            hash_md5 = hashlib.md5()
+            if offset:
+                with open(part_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                        hash_md5.update(chunk)
+            
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        hash_md5.update(chunk)
+                        progress_bar.update(len(chunk))
+        
+        return hash_md5.hexdigest()
+    
+    def _download_parallel(self, url, part_path, total_size, progress_bar):
+        """
+        Download a file with parallel HTTP Range requests into a preallocated file.
+        Per-range progress is saved next to the file so a rerun resumes each range.
+        
+        Args:
+            url (str): File URL
+            part_path (str): Partial download path
+            total_size (int): File size from Content-Length
+            progress_bar: tqdm progress bar
+        """
+        state_path = part_path + ".json"
+        segment = -(-total_size // DOWNLOAD_CONNECTIONS)
+        ranges = [(start, min(start + segment, total_size)) for start in range(0, total_size, segment)]
+        
+        # Resume per-range progress from an earlier attempt at the same file
+        done = [0] * len(ranges)
+        if os.path.exists(part_path) and os.path.exists(state_path):
+            try:
+                with open(state_path, 'r') as f:
+                    state = json.load(f)
+                if state.get("total_size") == total_size and len(state.get("done", [])) == len(ranges):
+                    done = state["done"]
+            except (OSError, ValueError):
+                pass
+        progress_bar.update(sum(done))
+        
+        state_lock = threading.Lock()
+        
+        def save_state():
+            with open(state_path, 'w') as f:
+                json.dump({"total_size": total_size, "done": done}, f)
+        
+        fd = os.open(part_path, os.O_RDWR | os.O_CREAT)
+        try:
+            # Reserve the full size up front so ranges land in contiguous extents
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, total_size)
+            else:
+                os.ftruncate(fd, total_size)
+            
+            def fetch(index):
+                start, end = ranges[index]
+                offset = start + done[index]
+                if offset >= end:
+                    return
+                
+                headers = {"Range": f"bytes={offset}-{end - 1}"}
+                with requests.get(url, headers=headers, stream=True) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise IOError("Server ignored the Range request")
+                    
+                    unsaved = 0
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        unsaved += len(chunk)
+                        progress_bar.update(len(chunk))
+                        
+                        if unsaved >= DOWNLOAD_STATE_INTERVAL:
+                            with state_lock:
+                                done[index] = offset - start
+                                save_state()
+                            unsaved = 0
+                
+                if offset != end:
+                    raise IOError(f"Incomplete range {start}-{end - 1}")
+                with state_lock:
+                    done[index] = offset - start
+                    save_state()
+            
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                # list() re-raises the first failed range
+                list(executor.map(fetch, range(len(ranges))))
+        finally:
+            os.close(fd)
+        
+        os.remove(state_path)
+    
     def get_model_path(self, model_name):
         """
         Get the path to a model file, downloading if necessary.
@@ -188,18 +358,27 @@ class ModelManager:
         """
         model_status = {}
         
+        # Verify models concurrently; hashing releases the GIL, so this is bound by disk bandwidth
+        with ThreadPoolExecutor(max_workers=min(4, len(self.models)) or 1) as executor:
+            validity = dict(zip(self.models, executor.map(self.check_model, self.models)))
+        
+        # Size every file in the models directory from a single directory scan
+        with os.scandir(self.models_dir) as entries:
+            file_sizes = {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+        
         for model_name in self.models:
             model_info = self.models[model_name]
             model_path = os.path.join(self.models_dir, model_info["filename"])
+            file_size = file_sizes.get(model_info["filename"])
             
             status = {
                 "name": model_name,
                 "filename": model_info["filename"],
                 "path": model_path,
-                "available": os.path.exists(model_path),
-                "size_mb": round(os.path.getsize(model_path) / (1024 * 1024), 2) if os.path.exists(model_path) else 0,
+                "available": file_size is not None,
+                "size_mb": round(file_size / (1024 * 1024), 2) if file_size is not None else 0,
                 "expected_size_mb": round(model_info["size"] / (1024 * 1024), 2) if model_info["size"] else "Unknown",
-                "valid": self.check_model(model_name)
+                "valid": validity[model_name]
             }
             
             model_status[model_name] = status
@@ -0,0 +1,5 @@
+import sys
+from PyQt5.QtWidgets import QApplication
+
+# Process-wide QApplication shared by all GUI tests; Qt allows only one per process
+QAPP = QApplication.instance() or QApplication(sys.argv)
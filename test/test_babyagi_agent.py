@@ -0,0 +1,36 @@
+import unittest
+from unittest.mock import patch
+from src.task_management.babyagi_agent import BabyAgiAgent
+
+class TestBabyAgiAgent(unittest.TestCase):
+    """
+    Unit tests for BabyAGI task queue bookkeeping.
+    """
+    
+    def setUp(self):
+        """
+        Build an agent with the model and memory backends mocked out.
+        """
+        with patch("src.task_management.babyagi_agent.AIModel"), \
+                patch("src.task_management.babyagi_agent.SelfLearningAI"):
+            self.agent = BabyAgiAgent()
+        self.agent.memory.retrieve_context.return_value = ""
+        self.agent.memory.generate_embedding.return_value = [1.0, 0.0]
+        self.agent.ai_model.generate_response.return_value = "done"
+    
+    def test_duplicate_objective_after_compaction(self):
+        """
+        Test that heap compaction keeps the de-duplication index.
+        """
+        task_ids = [self.agent.add_task(f"t{i}") for i in range(100)]
+        
+        # Executing by ID leaves stale heap entries; enough of them trigger compaction
+        for task_id in task_ids[:65]:
+            self.agent.execute_task(task_id)
+        self.assertEqual(self.agent._stale_heap_entries, 0, "Heap should have been compacted")
+        
+        self.assertEqual(self.agent.add_task("t0"), task_ids[0])
+        self.assertEqual(self.agent.add_task("t99"), task_ids[99])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.training import dataset_loader
+from src.training.dataset_loader import DatasetLoader
+
+# Blank fields in both the text and numeric columns, plus a quoted empty string
+_CSV = 'id,text,score\n1,hello,0.5\n2,,1.5\n3,world,\n4,"",2.0\n'
+
+class TestDatasetLoader(unittest.TestCase):
+    """
+    Unit tests for CSV dataset loading.
+    """
+    
+    def setUp(self):
+        """
+        Write the CSV fixture to a temporary directory.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, "dataset.csv")
+        with open(self.csv_path, "w") as f:
+            f.write(_CSV)
+        self.loader = DatasetLoader(data_dir=self.temp_dir.name)
+    
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_pyarrow_csv_matches_pandas_on_blank_fields(self):
+        """
+        Test that the pyarrow CSV path reports blank fields as missing, like pandas.
+        """
+        if not dataset_loader.PYARROW_AVAILABLE:
+            self.skipTest("pyarrow not available")
+        
+        arrow_df = self.loader.load_csv_dataset(self.csv_path)
+        pandas_df = pd.read_csv(self.csv_path)
+        
+        self.assertEqual(list(arrow_df.columns), list(pandas_df.columns))
+        pd.testing.assert_frame_equal(arrow_df.isna(), pandas_df.isna())
+        self.assertEqual(
+            arrow_df.astype(object).where(arrow_df.notna(), None).values.tolist(),
+            pandas_df.astype(object).where(pandas_df.notna(), None).values.tolist()
+        )
+        
+        # Downstream dropna() cleaning still removes the blank rows
+        self.assertEqual(arrow_df.dropna(subset=["text"])["id"].tolist(), [1, 3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
 import unittest
-import sys
-from PyQt5.QtWidgets import QApplication
+import pytest
+from PyQt5.QtWidgets import QWidget
+from _qapp import QAPP
 from src.gui.main_window import AI_GUI
 
+pytestmark = pytest.mark.gui
+
 class TestGUI(unittest.TestCase):
     """
     Unit tests for the AI GUI functionalities.
@@ -13,17 +16,18 @@ class TestGUI(unittest.TestCase):
         """
         Setup before running the GUI tests.
         """
-        # Create QApplication instance if needed
-        if not QApplication.instance():
-            cls.app = QApplication(sys.argv)
-        else:
-            cls.app = QApplication.instance()
+        # Reuse the process-wide QApplication
+        cls.app = QAPP
+        
+        # Build the window once; tests reset its state in setUp
+        cls.gui = AI_GUI()
     
     def setUp(self):
         """
-        Setup GUI instance before each test.
+        Reset GUI state before each test.
         """
-        self.gui = AI_GUI()
+        self.gui.input_box.clear()
+        self.gui.chat_display.clear()
     
     def test_gui_initialization(self):
         """
@@ -36,10 +40,9 @@ class TestGUI(unittest.TestCase):
         """
         Test if GUI components exist.
         """
-        self.assertIsNotNone(self.gui.chat_display, "Chat display should exist")
-        self.assertIsNotNone(self.gui.input_box, "Input box should exist")
-        self.assertIsNotNone(self.gui.send_button, "Send button should exist")
-        self.assertIsNotNone(self.gui.voice_button, "Voice button should exist")
+        names = {child.objectName() for child in self.gui.findChildren(QWidget)}
+        required = {"chat_display", "input_box", "send_button", "voice_button"}
+        self.assertLessEqual(required, names, f"Missing widgets: {required - names}")
     
     def test_input_processing(self):
         """
@@ -48,14 +51,8 @@ class TestGUI(unittest.TestCase):
         # Set test input
         self.gui.input_box.setText("Test message")
         
-        # Process should not raise error
-        try:
-            self.gui.process_input()
-            success = True
-        except:
-            success = False
-            
-        self.assertTrue(success, "Input processing should not cause errors")
+        # Any exception here fails the test with its own traceback
+        self.gui.process_input()
         
         # Input should be cleared
         self.assertEqual(self.gui.input_box.text(), "", "Input box should be cleared after processing")
@@ -65,7 +62,8 @@ class TestGUI(unittest.TestCase):
         """
         Cleanup after all tests.
         """
-        pass
+        cls.gui.close()
+        cls.gui.deleteLater()
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,66 +1,90 @@
 import unittest
+import pytest
 import os
 import tempfile
+import wave
 import numpy as np
+from unittest.mock import patch
+from src.ai_core import voice_processing
 from src.ai_core.voice_processing import VoiceAssistant
 
+pytestmark = pytest.mark.voice
+
+# Tiny fixture: the tests check the WAV header, not the audio content
+_SR = 16000
+_AUDIO = np.array([0, 0.1, -0.1, 0], dtype=np.float32)
+
 class TestVoiceAssistant(unittest.TestCase):
     """
     Unit tests for the Voice Assistant functionalities.
     """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Build one Voice Assistant for all tests in the class.
+        """
+        # Engine and model setup is the expensive part; do it once per class
+        cls.voice_assistant = VoiceAssistant()
     
     def setUp(self):
         """
-        Setup Voice Assistant instance before each test.
+        Reset the shared Voice Assistant before each test.
         """
-        self.voice_assistant = VoiceAssistant()
+        self.voice_assistant._reset()
     
-    def test_initialization(self):
+    def test_a_initialization(self):
         """
         Test if Voice Assistant initializes correctly.
         """
         self.assertIsNotNone(self.voice_assistant)
         self.assertFalse(self.voice_assistant.is_listening)
-    
-    def test_tts_functionality(self):
+
+    def test_b_save_wav(self):
+        """
+        Test WAV file saving functionality.
+        """
+        # Temporary directory is removed even if an assertion fails
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = os.path.join(temp_dir, "t.wav")
+
+            # Save the audio
+            self.voice_assistant._save_wav(temp_path, _AUDIO, _SR)
+
+            # Read back only the header
+            with wave.open(temp_path, 'rb') as wf:
+                self.assertEqual(wf.getnchannels(), 1)
+                self.assertEqual(wf.getsampwidth(), 2)
+                self.assertEqual(wf.getframerate(), _SR)
+                self.assertEqual(wf.getnframes(), len(_AUDIO))
+
+    def test_y_tts_functionality(self):
         """
         Test if text-to-speech function executes without error.
         """
-        try:
-            # Use a short text to minimize test duration
+        if self.voice_assistant.tts_engine is None:
+            self.skipTest("no TTS backend")
+
+        # Don't synthesize or play audio, only exercise speak()'s control flow
+        with patch.object(self.voice_assistant.tts_engine, "runAndWait") as mock_run:
             success = self.voice_assistant.speak("Test")
-            # May return False if TTS engine is not available
-        except Exception:
-            success = False
-        
-        # We don't assert success since TTS may not be available on all systems
-        # Just ensure it doesn't throw an exception
-        self.assertIsNotNone(success)
-    
-    def test_save_wav(self):
+
+        self.assertTrue(success)
+        mock_run.assert_called_once()
+
+    def test_z_listen(self):
         """
-        Test WAV file saving functionality.
+        Test that listen() returns the recognizer's transcription without a microphone.
         """
-        # Create a temporary test file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_path = temp_file.name
-            
-        try:
-            # Generate a short sine wave audio sample
-            sample_rate = 16000
-            audio_data = np.sin(2 * np.pi * 440 * np.linspace(0, 1, sample_rate)).astype(np.float32)
-            
-            # Save the audio
-            self.voice_assistant._save_wav(temp_path, audio_data, sample_rate)
-            
-            # Check if file exists and has content
-            self.assertTrue(os.path.exists(temp_path))
-            self.assertGreater(os.path.getsize(temp_path), 0)
-            
-        finally:
-            # Clean up
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        # Force the speech_recognition path and stub out the blocking capture
+        with patch.multiple(voice_processing, SPEECH_RECOGNITION_AVAILABLE=True, WHISPER_AVAILABLE=False), \
+                patch.object(self.voice_assistant, "recognizer", object()), \
+                patch.object(self.voice_assistant, "_listen_with_sr", return_value="hello") as mock_listen:
+            result = self.voice_assistant.listen()
+
+        self.assertEqual(result, "hello")
+        mock_listen.assert_called_once_with(5, None)
+        self.assertFalse(self.voice_assistant.is_listening)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file